@@ -0,0 +1,199 @@
+import argparse
+import contextlib
+import os
+import sys
+import numpy as np
+from PIL import GifImagePlugin, Image, ImageSequence
+import glyph_atlas
+import img_art
+import profiling
+from png_stream import APNGStreamWriter
+
+# Frames without timing information (and single images) are shown this long
+DEFAULT_DURATION = 100
+# Duplicate detection: luminance box-downsampled to 32x32; frames whose thumbnails differ
+# by at most DUPLICATE_TOLERANCE levels anywhere count as the same frame
+SIGNATURE_SIZE = 32
+DUPLICATE_TOLERANCE = 2
+
+def frame_signature(frame):
+    small = frame.convert("L").resize((SIGNATURE_SIZE, SIGNATURE_SIZE), Image.BOX)
+    return np.asarray(small, dtype=np.int16)
+
+def same_signature(a, b):
+    # Compared with a tolerance rather than hashed: a hash of quantized values misses
+    # near-identical frames whose pixels sit on either side of a quantization step
+    return b is not None and int(np.abs(a - b).max()) <= DUPLICATE_TOLERANCE
+
+class AnimationConverter:
+    # Iterates the frames of a GIF/APNG/WebP/TIFF with ImageSequence and yields
+    # (AsciiFrame, duration ms). Consecutive frames that look the same, by luminance
+    # signature before conversion or by identical text after it, are merged into one
+    # frame that is shown for their combined duration.
+    def __init__(self, image_path, new_width=100, ramp=None, dedupe=True):
+        self.image_path = image_path
+        self.new_width = new_width
+        self.ramp = ramp
+        self.dedupe = dedupe
+        self.frames_read = 0
+        self.frames_skipped = 0
+
+    def __iter__(self):
+        pending = None
+        previous_signature = None
+        with Image.open(self.image_path) as img:
+            for frame in ImageSequence.Iterator(img):
+                self.frames_read += 1
+                duration = frame.info.get("duration") or DEFAULT_DURATION
+                if self.dedupe:
+                    with profiling.stage("dedupe"):
+                        signature = frame_signature(frame)
+                    if same_signature(signature, previous_signature):
+                        self.frames_skipped += 1
+                        pending = (pending[0], pending[1] + duration)
+                        continue
+                    previous_signature = signature
+                # Palette frames are converted before resizing, so they are resampled in
+                # luminance instead of nearest-neighbour on palette indices
+                pixels = img_art.resize_image(frame, self.new_width, fast_load=True)
+                ascii_frame = img_art.pixels_to_frame(pixels, self.ramp)
+                if (self.dedupe and pending is not None
+                        and np.array_equal(pending[0].indices, ascii_frame.indices)):
+                    self.frames_skipped += 1
+                    pending = (pending[0], pending[1] + duration)
+                    continue
+                if pending is not None:
+                    yield pending
+                pending = (ascii_frame, duration)
+        if pending is not None:
+            yield pending
+
+class FrameRenderer:
+    # Renders every frame into the same coverage canvas. Coverage values index the
+    # 256-color table of blended text colors, so the canvas is a palette image as is.
+    def __init__(self, is_dark_mode=True):
+        (self.font, self.char_width, self.char_height, self.padding,
+         bg_color, text_color) = img_art.ascii_layout(is_dark_mode)
+        self.palette = glyph_atlas.get_color_table(bg_color, text_color)
+        self.canvas = None
+
+    def render(self, ascii_frame):
+        with profiling.stage("rasterize"):
+            coverage = glyph_atlas.render_coverage(ascii_frame, self.font, self.char_width, self.char_height,
+                                                   self.padding, out=self.canvas)
+        self.canvas = coverage if coverage.base is None else coverage.base
+        return coverage
+
+@contextlib.contextmanager
+def open_atomic(output_path, mode="wb", **kwargs):
+    # Writes go to a temporary file next to output_path that replaces it only once every
+    # frame is written, so a failed or interrupted run never leaves a truncated output
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def write_gif(frames, output_path, is_dark_mode=True, loop=0):
+    # Frames are encoded and written one at a time against one global palette
+    renderer = FrameRenderer(is_dark_mode)
+    count = 0
+    with open_atomic(output_path) as f:
+        for ascii_frame, duration in frames:
+            img = Image.fromarray(renderer.render(ascii_frame))
+            img.putpalette(renderer.palette.tobytes())
+            with profiling.stage("encode"):
+                if count == 0:
+                    header, _ = GifImagePlugin.getheader(img, renderer.palette.tobytes(),
+                                                         {"loop": loop, "duration": duration})
+                    f.write(b"".join(header))
+                    size = img.size
+                elif img.size != size:
+                    raise ValueError("All frames of a GIF must have the same size")
+                chunks = GifImagePlugin.getdata(img, duration=duration)
+                f.write(b"".join(chunks))
+                # The list lives on a class Pillow creates per call, which only the cyclic
+                # garbage collector frees; emptying it keeps memory flat across frames
+                chunks.clear()
+            count += 1
+        if count == 0:
+            raise ValueError("No frames to write")
+        f.write(b";")
+    return count
+
+def write_apng(frames, output_path, is_dark_mode=True, loop=0):
+    renderer = FrameRenderer(is_dark_mode)
+    writer = None
+    with open_atomic(output_path) as f:
+        for ascii_frame, duration in frames:
+            coverage = renderer.render(ascii_frame)
+            with profiling.stage("encode"):
+                if writer is None:
+                    height, width = coverage.shape
+                    writer = APNGStreamWriter(f, width, height, "P", renderer.palette, loop)
+                writer.write_frame(coverage, duration)
+        if writer is None:
+            raise ValueError("No frames to write")
+        writer.close()
+    return writer.frames
+
+def write_text_stream(frames, output_path):
+    # Every frame starts with a line holding its duration in milliseconds; frames are
+    # separated by a form feed like video_art's text output
+    count = 0
+    with open_atomic(output_path, "w", encoding="utf-8") as f:
+        for ascii_frame, duration in frames:
+            if count:
+                f.write("\f")
+            f.write(f"{duration}\n{ascii_frame}")
+            count += 1
+    return count
+
+def read_text_stream(path):
+    # Yields (ascii_art, duration ms) from a file written by write_text_stream; a stream
+    # with no frames is an empty file
+    with open(path, encoding="utf-8") as f:
+        data = f.read()
+    if data:
+        for chunk in data.split("\f"):
+            duration, _, ascii_art = chunk.partition("\n")
+            yield ascii_art, int(duration)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert an animated GIF (or APNG/WebP) to animated ASCII art")
+    parser.add_argument("image", help="Animated image path")
+    parser.add_argument("-o", "--output", required=True, help="Output .gif, .png/.apng or .txt")
+    parser.add_argument("-w", "--width", type=int, default=100)
+    parser.add_argument("--ramp", default=None, help="Ramp name (standard, extended) or custom characters")
+    parser.add_argument("--dark", action="store_true", help="Render image output in dark mode")
+    parser.add_argument("--keep-duplicates", action="store_true", help="Convert every frame, even repeats")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage time breakdown")
+    args = parser.parse_args(argv)
+
+    timer = profiling.StageTimer()
+    if args.profile:
+        profiling.add_hook(timer)
+
+    frames = AnimationConverter(args.image, args.width, args.ramp, not args.keep_duplicates)
+    output = args.output.lower()
+    if output.endswith(".txt"):
+        count = write_text_stream(frames, args.output)
+    elif output.endswith(".gif"):
+        count = write_gif(frames, args.output, args.dark)
+    elif output.endswith((".png", ".apng")):
+        count = write_apng(frames, args.output, args.dark)
+    else:
+        parser.error("Output must end in .gif, .png, .apng or .txt")
+    print(f"Wrote {count} frames ({frames.frames_skipped} of {frames.frames_read} merged as duplicates)")
+    if args.profile:
+        print(timer.report(), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
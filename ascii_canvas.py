@@ -0,0 +1,141 @@
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+class VirtualASCIIView(ttk.Frame):
+    # Keeps the art as a list of rows and only draws the rows and columns that fit in
+    # the viewport, reusing one canvas text item per visible row. Scrolling and updates
+    # therefore cost O(visible rows) no matter how large the art is.
+    def __init__(self, parent, font=('Courier', 12), bg='white', fg='black', width=100, height=40,
+                 **kwargs):
+        super().__init__(parent, **kwargs)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.font = tkfont.Font(font=font)
+        self.fg = fg
+        self.rows = []
+        self.columns = 0
+        self.top = 0
+        self.left = 0
+        self.overview = False
+        self._items = []
+
+        # Initial size in characters, like tk.Text
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0,
+                                width=width * self._char_width(), height=height * self._line_height())
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+
+        # Scrollbars drive the virtual offsets rather than a real scroll region
+        self.y_scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.y_scrollbar.grid(row=0, column=1, sticky='ns')
+        self.x_scrollbar = ttk.Scrollbar(self, orient='horizontal', command=self.xview)
+        self.x_scrollbar.grid(row=1, column=0, sticky='ew')
+
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        self.canvas.bind('<MouseWheel>', self._on_mousewheel)
+        self.canvas.bind('<Shift-MouseWheel>', lambda e: self._on_mousewheel(e, horizontal=True))
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+
+    def set_text(self, ascii_art):
+        rows = ascii_art.split("\n")
+        if rows and rows[-1] == "":
+            rows.pop()
+        self.rows = rows
+        self.columns = max((len(row) for row in rows), default=0)
+        self.top = 0
+        self.left = 0
+        self.redraw()
+
+    def get_text(self):
+        return "\n".join(self.rows)
+
+    def set_overview(self, enabled):
+        self.overview = enabled
+        self.top = 0
+        self.left = 0
+        self.redraw()
+
+    def _step(self):
+        # Overview mode keeps every n-th row and column so the whole art fits the viewport
+        if not self.overview or not self.rows:
+            return 1
+        fit_rows = max(1, self.canvas.winfo_height() // self._line_height())
+        fit_columns = max(1, self.canvas.winfo_width() // self._char_width())
+        return max(1, -(-len(self.rows) // fit_rows), -(-self.columns // fit_columns))
+
+    def _line_height(self):
+        return max(1, self.font.metrics("linespace"))
+
+    def _char_width(self):
+        return max(1, self.font.measure("M"))
+
+    def _viewport(self):
+        visible_rows = max(1, self.canvas.winfo_height() // self._line_height())
+        visible_columns = max(1, self.canvas.winfo_width() // self._char_width() + 1)
+        return visible_rows, visible_columns
+
+    def redraw(self):
+        step = self._step()
+        total_rows = -(-len(self.rows) // step)
+        total_columns = -(-self.columns // step)
+        visible_rows, visible_columns = self._viewport()
+        self.top = max(0, min(self.top, total_rows - visible_rows))
+        self.left = max(0, min(self.left, total_columns - visible_columns + 1))
+
+        # Grow the item pool to the viewport size; spare items are blanked, not deleted
+        line_height = self._line_height()
+        while len(self._items) < visible_rows:
+            self._items.append(self.canvas.create_text(
+                2, 2 + len(self._items) * line_height, anchor='nw', font=self.font, fill=self.fg))
+
+        first_column = self.left * step
+        last_column = (self.left + visible_columns) * step
+        for i, item in enumerate(self._items):
+            row_index = (self.top + i) * step
+            if i < visible_rows and row_index < len(self.rows):
+                text = self.rows[row_index][first_column:last_column:step]
+            else:
+                text = ""
+            self.canvas.itemconfigure(item, text=text)
+
+        self._update_scrollbars(total_rows, total_columns, visible_rows, visible_columns)
+
+    def _update_scrollbars(self, total_rows, total_columns, visible_rows, visible_columns):
+        if total_rows:
+            self.y_scrollbar.set(self.top / total_rows, min(1.0, (self.top + visible_rows) / total_rows))
+        else:
+            self.y_scrollbar.set(0, 1)
+        if total_columns:
+            self.x_scrollbar.set(self.left / total_columns,
+                                 min(1.0, (self.left + visible_columns) / total_columns))
+        else:
+            self.x_scrollbar.set(0, 1)
+
+    def _scroll(self, attribute, total, visible, action, amount, unit=None):
+        if action == 'moveto':
+            value = int(float(amount) * total)
+        elif unit == 'pages':
+            value = getattr(self, attribute) + int(amount) * max(1, visible - 1)
+        else:
+            value = getattr(self, attribute) + int(amount)
+        setattr(self, attribute, value)
+        self.redraw()
+
+    def yview(self, *args):
+        step = self._step()
+        self._scroll('top', -(-len(self.rows) // step), self._viewport()[0], *args)
+
+    def xview(self, *args):
+        step = self._step()
+        self._scroll('left', -(-self.columns // step), self._viewport()[1], *args)
+
+    def _on_mousewheel(self, event, horizontal=False):
+        units = -1 if event.delta > 0 else 1
+        if abs(event.delta) >= 120:
+            units *= abs(event.delta) // 120
+        if horizontal:
+            self.xview('scroll', units * 3, 'units')
+        else:
+            self.yview('scroll', units * 3, 'units')
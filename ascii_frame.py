@@ -0,0 +1,106 @@
+from lazyload import lazy_import
+
+np = lazy_import("numpy")
+
+class AsciiFrame:
+    # ASCII art as a (rows, columns) uint8 array of indices into a ramp of up to 256
+    # characters: one byte per cell instead of a Python str's one to four, with no newline
+    # bookkeeping. Renderers map the ramp to glyphs once and index the array directly;
+    # the text is only built (and then cached) when str() or bytes() asks for it.
+    # str(frame) matches pixels_to_ascii: every row, the last included, ends in "\n".
+    __slots__ = ("indices", "ramp", "_text")
+
+    def __init__(self, indices, ramp):
+        indices = np.asarray(indices)
+        if indices.ndim != 2:
+            raise ValueError("Frame indices must be a 2D array")
+        if not 0 < len(ramp) <= 256:
+            raise ValueError("Frame ramp must have 1 to 256 characters")
+        self.indices = indices.astype(np.uint8, copy=False)
+        self.ramp = ramp
+        self._text = None
+
+    @classmethod
+    def from_text(cls, text):
+        # Any text with at most 256 distinct characters; short rows are padded with spaces
+        lines = text.split("\n")
+        if lines and lines[-1] == "":
+            lines.pop()
+        columns = max((len(line) for line in lines), default=0)
+        padded = "".join(line.ljust(columns) for line in lines)
+        codepoints = np.frombuffer(padded.encode("utf-32-le"), dtype="<u4")
+        unique, inverse = np.unique(np.append(codepoints, ord(" ")), return_inverse=True)
+        if len(unique) > 256:
+            raise ValueError("Text has more than 256 distinct characters")
+        ramp = "".join(chr(c) for c in unique)
+        return cls(inverse[:-1].reshape(len(lines), columns), ramp)
+
+    @property
+    def width(self):
+        return self.indices.shape[1]
+
+    @property
+    def height(self):
+        return self.indices.shape[0]
+
+    @property
+    def line_count(self):
+        # Lines of str(frame) including the empty one after the final newline, so image
+        # layouts come out the same size as for the text
+        return self.height + 1
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, key):
+        # An int gives that row as text; a slice gives a frame viewing the same array
+        if isinstance(key, slice):
+            return AsciiFrame(self.indices[key], self.ramp)
+        return self.ramp_array()[self.indices[key]].tobytes().decode("utf-32-le")
+
+    def __iter__(self):
+        for row in range(self.height):
+            yield self[row]
+
+    def ramp_array(self):
+        return np.array([ord(c) for c in self.ramp], dtype="<u4")
+
+    def __str__(self):
+        if self._text is None:
+            out = np.empty((self.height, self.width + 1), dtype="<u4")
+            out[:, :self.width] = self.ramp_array()[self.indices]
+            out[:, self.width] = ord("\n")
+            self._text = out.tobytes().decode("utf-32-le")
+        return self._text
+
+    def __bytes__(self):
+        # UTF-8 text; ASCII ramps are encoded straight from the index array
+        if self._text is None and self.ramp.isascii():
+            out = np.empty((self.height, self.width + 1), dtype=np.uint8)
+            out[:, :self.width] = np.frombuffer(self.ramp.encode("ascii"), dtype=np.uint8)[self.indices]
+            out[:, self.width] = ord("\n")
+            return out.tobytes()
+        return str(self).encode("utf-8")
+
+    def __repr__(self):
+        return f"AsciiFrame({self.width}x{self.height}, ramp={self.ramp!r})"
+
+    def __array__(self, dtype=None, copy=None):
+        # np.asarray(frame) is the index array itself, without a copy
+        if dtype is not None and np.dtype(dtype) != self.indices.dtype:
+            return self.indices.astype(dtype)
+        return self.indices.copy() if copy else self.indices
+
+    def as_memoryview(self):
+        # The index bytes without a copy, on every Python version; row slices of a frame
+        # give views of the same memory
+        return memoryview(self.indices)
+
+    def __buffer__(self, flags):
+        # memoryview(frame) through the Python-level buffer protocol (PEP 688), which
+        # only exists from Python 3.12; use as_memoryview() where 3.11 must work
+        return self.as_memoryview()
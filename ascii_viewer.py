@@ -1,10 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
+from ascii_canvas import VirtualASCIIView
+from font_gallery import FontGallery
+from gallery_window import FontGalleryWindow
 import img_art
-from text_art import TextArtGenerator
+import pyramid
+from incremental_figlet import IncrementalFigletCache, update_text_widget
+from render_worker import RenderWorker
 import os
-import pyfiglet
+import resources
 
 class UnifiedASCIIConverter:
     def __init__(self):
@@ -16,6 +20,7 @@ class UnifiedASCIIConverter:
         self.window.grid_rowconfigure(0, weight=1)
         self.window.grid_columnconfigure(0, weight=1)
         
+        self.font_gallery = FontGallery()
         self.setup_choice_ui()
         
     def setup_choice_ui(self):
@@ -99,6 +104,10 @@ class UnifiedASCIIConverter:
         for widget in self.window.winfo_children():
             widget.grid_remove()
         
+        # Renders still in flight are for the text UI being left
+        if hasattr(self, 'text_render_worker'):
+            self.text_render_worker.stop()
+        
         # Show choice UI
         self.setup_choice_ui()
     
@@ -124,36 +133,34 @@ class UnifiedASCIIConverter:
         self.file_label = ttk.Label(control_frame, text="No image selected")
         self.file_label.grid(row=0, column=1, padx=5)
         
+        # Output width; changes re-target the loaded image's pyramid without re-decoding
+        self.image_width = tk.IntVar(value=100)
+        self.width_label = ttk.Label(control_frame, text="Width: 100")
+        self.width_label.grid(row=0, column=2, padx=5)
+        ttk.Scale(
+            control_frame,
+            from_=20,
+            to=400,
+            variable=self.image_width,
+            command=self.change_image_width,
+            length=200
+        ).grid(row=0, column=3, padx=5)
+        
         # ASCII preview panel
         preview_frame = ttk.LabelFrame(main_frame, text="ASCII Preview")
         preview_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
         preview_frame.grid_columnconfigure(0, weight=1)
         preview_frame.grid_rowconfigure(0, weight=1)
         
-        # Bigger ASCII preview with larger font
-        self.ascii_preview = tk.Text(
+        # Virtualized ASCII preview: only the visible rows are drawn
+        self.ascii_preview = VirtualASCIIView(
             preview_frame, 
-            wrap=tk.NONE, 
             bg='white', 
             fg='black',
-            font=('Courier', 12),  # Increased font size
-            width=100,  # Set initial width
-            height=40   # Set initial height
+            font=('Courier', 12)
         )
         self.ascii_preview.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
         
-        # Scrollbars
-        y_scrollbar = ttk.Scrollbar(preview_frame, orient='vertical',
-                                  command=self.ascii_preview.yview)
-        y_scrollbar.grid(row=0, column=1, sticky='ns')
-        
-        x_scrollbar = ttk.Scrollbar(preview_frame, orient='horizontal',
-                                  command=self.ascii_preview.xview)
-        x_scrollbar.grid(row=1, column=0, sticky='ew')
-        
-        self.ascii_preview.configure(yscrollcommand=y_scrollbar.set,
-                                   xscrollcommand=x_scrollbar.set)
-        
         # Bottom control panel with bigger buttons
         bottom_frame = ttk.Frame(main_frame)
         bottom_frame.grid(row=2, column=0, pady=10)
@@ -171,6 +178,15 @@ class UnifiedASCIIConverter:
             command=lambda: self.save_ascii('txt'),
             width=20  # Make button wider
         ).pack(side=tk.LEFT, padx=5)
+        
+        # Zoomed-out view of the whole art
+        self.overview_mode = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            bottom_frame,
+            text="Overview",
+            variable=self.overview_mode,
+            command=lambda: self.ascii_preview.set_overview(self.overview_mode.get())
+        ).pack(side=tk.LEFT, padx=5)
     
     def load_image(self):
         file_path = filedialog.askopenfilename(
@@ -183,14 +199,30 @@ class UnifiedASCIIConverter:
             # Update file label
             self.file_label.config(text=f"File: {os.path.basename(file_path)}")
             
-            # Convert to ASCII
-            self.current_ascii_art = img_art.image_to_ascii(file_path)
-            self.ascii_preview.delete(1.0, tk.END)
-            self.ascii_preview.insert(1.0, self.current_ascii_art)
+            # Convert through the same pyramid the width slider resamples from, so a width
+            # looks the same whether it was loaded or reached with the slider
+            self.current_image_path = file_path
+            self.current_width = self.image_width.get()
+            self.current_ascii_art = pyramid.get_image(file_path).to_ascii(self.current_width)
+            self.ascii_preview.set_text(self.current_ascii_art)
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load image: {str(e)}")
     
+    def change_image_width(self, value):
+        width = int(float(value))
+        self.width_label.config(text=f"Width: {width}")
+        if not getattr(self, 'current_image_path', None) or width == self.current_width:
+            return
+        try:
+            # The first change decodes once; later ones resample from the cached pyramid
+            image = pyramid.get_image(self.current_image_path)
+            self.current_width = width
+            self.current_ascii_art = image.to_ascii(width)
+            self.ascii_preview.set_text(self.current_ascii_art)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to resize image: {str(e)}")
+    
     def save_ascii(self, format_type):
         if not hasattr(self, 'current_ascii_art') or not self.current_ascii_art:
             messagebox.showwarning("Warning", "No ASCII art to save!")
@@ -242,7 +274,7 @@ class UnifiedASCIIConverter:
         ttk.Label(control_frame, text="Font Style:").grid(row=1, column=0, padx=5, pady=5)
         self.font_style = ttk.Combobox(
             control_frame, 
-            values=sorted(pyfiglet.FigletFont.getFonts()), 
+            values=resources.list_figlet_fonts(), 
             width=47
         )
         self.font_style.set("standard")
@@ -296,17 +328,52 @@ class UnifiedASCIIConverter:
             command=lambda: self.save_text_ascii('txt'),
             width=20
         ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            bottom_frame, 
+            text="Font Gallery",
+            command=self.show_font_gallery,
+            width=20
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Status bar with render latency
+        self.text_status_label = ttk.Label(main_frame, text="Render latency: -")
+        self.text_status_label.grid(row=3, column=0, sticky="w", padx=5)
+        
+        # Figlet rendering runs off the main thread so typing never blocks the UI
+        if hasattr(self, 'text_render_worker'):
+            self.text_render_worker.stop()
+        # Only the suffix after the previous text is re-rendered, per font
+        self.figlet_renderers = IncrementalFigletCache()
+        # Tied to main_frame, so results arriving after it is gone are dropped
+        self.text_render_worker = RenderWorker(
+            main_frame,
+            self.figlet_renderers.render,
+            self.show_text_preview,
+            lambda e: messagebox.showerror("Error", f"Failed to generate ASCII art: {str(e)}")
+        )
 
     def generate_text_preview(self):
         text = self.text_input.get().strip()
         if text:
-            try:
-                f = pyfiglet.Figlet(font=self.font_style.get())
-                self.current_ascii_art = f.renderText(text)
-                self.text_preview.delete(1.0, tk.END)
-                self.text_preview.insert(1.0, self.current_ascii_art)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to generate ASCII art: {str(e)}")
+            self.text_render_worker.submit(text, self.font_style.get())
+
+    def show_font_gallery(self):
+        text = self.text_input.get().strip()
+        if not text:
+            messagebox.showwarning("Warning", "Enter some text first!")
+            return
+        FontGalleryWindow(self.window, self.font_gallery, text, self.select_text_font)
+
+    def select_text_font(self, font):
+        self.font_style.set(font)
+        self.generate_text_preview()
+
+    def show_text_preview(self, ascii_art):
+        # Rewrite only the changed columns of the changed lines
+        update_text_widget(self.text_preview, self.text_preview.get(1.0, 'end-1c'), ascii_art)
+        self.current_ascii_art = ascii_art
+        self.text_status_label.config(text=self.text_render_worker.latency_text())
 
     def save_text_ascii(self, format_type):
         if not hasattr(self, 'current_ascii_art') or not self.current_ascii_art:
@@ -340,6 +407,7 @@ class UnifiedASCIIConverter:
     
     def run(self):
         self.window.mainloop()
+        self.font_gallery.shutdown()
 
 if __name__ == "__main__":
     app = UnifiedASCIIConverter()
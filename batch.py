@@ -0,0 +1,256 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import conversion_cache
+import img_art
+import profiling
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tif", ".tiff")
+
+def _glob_base(pattern):
+    # The leading directories of a glob pattern that hold no wildcards
+    parts = pattern.replace(os.altsep or os.sep, os.sep).split(os.sep)
+    base = []
+    for part in parts[:-1]:
+        if glob.has_magic(part):
+            break
+        base.append(part)
+    return os.sep.join(base) or (os.sep if pattern.startswith(os.sep) else os.curdir)
+
+def collect_inputs(sources, manifest=None):
+    # Expand directories, globs and manifest entries into (input path, output stem) pairs.
+    # A stem is the input's path relative to the directory given, or to the fixed part
+    # of the glob, extension included (photos/a/x.jpg -> a/x.jpg), so x.jpg and x.png
+    # never clash and a file's outputs keep their name whatever else is in the batch.
+    entries = []
+    if manifest:
+        with open(manifest) as f:
+            sources = list(sources) + [line.strip() for line in f
+                                       if line.strip() and not line.startswith("#")]
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        entries.append((path, os.path.relpath(path, source)))
+        elif os.path.isfile(source):
+            entries.append((source, os.path.basename(source)))
+        else:
+            base = _glob_base(source)
+            for path in sorted(glob.glob(source, recursive=True)):
+                if os.path.isfile(path):
+                    entries.append((path, os.path.relpath(path, base)))
+    # Drop duplicates while keeping order; inputs that would still write the same outputs
+    # (a/x.jpg and b/x.jpg given as files) are an error rather than silently overwriting
+    # each other
+    seen = set()
+    owners = {}
+    unique = []
+    for path, stem in entries:
+        key = os.path.abspath(path)
+        if key in seen:
+            continue
+        seen.add(key)
+        other = owners.setdefault(os.path.normcase(stem), path)
+        if other != path:
+            raise ValueError(f"{other} and {path} would both be written as {stem}")
+        unique.append((path, stem))
+    return unique
+
+def output_paths(stem, output_dir, write_txt=True, write_png=True):
+    paths = []
+    if write_txt:
+        paths.append(os.path.join(output_dir, stem + ".txt"))
+    if write_png:
+        paths.append(os.path.join(output_dir, stem + ".png"))
+    return paths
+
+def settings_path(stem, output_dir):
+    # Sidecar recording the settings the outputs were converted with
+    return os.path.join(output_dir, stem + ".settings.json")
+
+def conversion_settings(width, ramp, is_dark_mode, fast_load):
+    return {"width": width, "ramp": img_art.get_ramp(ramp), "dark": is_dark_mode, "fast_load": fast_load}
+
+def is_up_to_date(input_path, outputs, sidecar, settings):
+    # Outputs newer than the input, converted with the same settings, mean the file was
+    # already converted. The sidecar is written after the outputs, so a conversion that
+    # was interrupted never counts as done.
+    try:
+        source_mtime = os.path.getmtime(input_path)
+        if not all(os.path.getmtime(path) >= source_mtime for path in outputs + [sidecar]):
+            return False
+        with open(sidecar) as f:
+            return json.load(f) == settings
+    except (OSError, ValueError):
+        return False
+
+def _temp_path(path):
+    # Same directory and extension as path, so the rename is atomic and encoders still
+    # pick the format from the extension
+    root, extension = os.path.splitext(path)
+    return f"{root}.{os.getpid()}.tmp{extension}"
+
+def _replace_from_temp(path, write):
+    # write(tmp_path) produces the file, which then replaces path in one rename
+    tmp_path = _temp_path(path)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def convert_one(input_path, outputs, width, ramp, is_dark_mode, cache_dir=None, cache_max_bytes=None,
+                profile=False, fast_load=False, sidecar=None):
+    # Runs in a worker process; errors are returned instead of raised so one bad file
+    # does not take down the batch
+    start = time.perf_counter()
+    timer = profiling.StageTimer()
+    if profile:
+        profiling.add_hook(timer)
+    try:
+        cache = conversion_cache.get_cache(cache_dir, cache_max_bytes) if cache_dir else None
+        if cache:
+            ascii_art = conversion_cache.cached_image_to_ascii(cache, input_path, width, ramp, fast_load)
+        else:
+            ascii_art = img_art.image_to_ascii(input_path, width, ramp, fast_load)
+        if sidecar:
+            # Outputs being replaced are not up to date until the new sidecar is written
+            try:
+                os.unlink(sidecar)
+            except OSError:
+                pass
+        for path in outputs:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if path.endswith(".txt"):
+                _replace_from_temp(path, lambda tmp_path: _write_text(tmp_path, ascii_art))
+            elif cache:
+                _replace_from_temp(path, lambda tmp_path: conversion_cache.cached_save_png(
+                    cache, input_path, ascii_art, tmp_path, width, ramp, is_dark_mode=is_dark_mode,
+                    fast_load=fast_load))
+            else:
+                _replace_from_temp(path, lambda tmp_path: img_art.save_ascii_to_png(
+                    ascii_art, tmp_path, is_dark_mode=is_dark_mode))
+        if sidecar:
+            settings = conversion_settings(width, ramp, is_dark_mode, fast_load)
+            _replace_from_temp(sidecar, lambda tmp_path: _write_text(tmp_path, json.dumps(settings)))
+        return input_path, None, time.perf_counter() - start, timer.totals
+    except Exception as e:
+        return input_path, f"{type(e).__name__}: {e}", time.perf_counter() - start, timer.totals
+    finally:
+        profiling.remove_hook(timer)
+
+def run_batch(entries, output_dir, width=100, ramp=None, workers=None, max_in_flight=None,
+              is_dark_mode=False, write_txt=True, write_png=True, force=False, log=print,
+              cache_dir=None, cache_max_bytes=conversion_cache.DEFAULT_MAX_BYTES, profile=False,
+              fast_load=False):
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    stats = {"converted": 0, "skipped": 0, "failed": 0, "bytes": 0, "errors": [],
+             "stages": profiling.StageTimer()}
+    start = time.perf_counter()
+
+    settings = conversion_settings(width, ramp, is_dark_mode, fast_load)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for input_path, stem in entries:
+            outputs = output_paths(stem, output_dir, write_txt, write_png)
+            sidecar = settings_path(stem, output_dir)
+            if not force and is_up_to_date(input_path, outputs, sidecar, settings):
+                stats["skipped"] += 1
+                continue
+            # Bound the number of queued tasks so memory stays flat on huge batches
+            while len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _record_result(future.result(), stats, log)
+            pending.add(pool.submit(convert_one, input_path, outputs, width, ramp, is_dark_mode,
+                                    cache_dir, cache_max_bytes, profile, fast_load, sidecar))
+        for future in wait(pending).done:
+            _record_result(future.result(), stats, log)
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+def _record_result(result, stats, log):
+    input_path, error, _, stage_totals = result
+    stats["stages"].merge(stage_totals)
+    if error:
+        stats["failed"] += 1
+        stats["errors"].append((input_path, error))
+        log(f"FAILED {input_path}: {error}")
+    else:
+        # Only converted inputs count towards MB/s
+        stats["converted"] += 1
+        stats["bytes"] += os.path.getsize(input_path)
+
+def format_summary(stats):
+    seconds = max(stats["seconds"], 1e-9)
+    megabytes = stats["bytes"] / (1024 * 1024)
+    return (f"Converted {stats['converted']}, skipped {stats['skipped']}, "
+            f"failed {stats['failed']} in {stats['seconds']:.2f}s "
+            f"({stats['converted'] / seconds:.1f} images/s, {megabytes / seconds:.2f} MB/s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert many images to ASCII art in parallel")
+    parser.add_argument("sources", nargs="*", help="Image files, directories or glob patterns")
+    parser.add_argument("-m", "--manifest", help="File listing one input path or glob per line")
+    parser.add_argument("-o", "--output-dir", default="ascii_output")
+    parser.add_argument("-w", "--width", type=int, default=100)
+    parser.add_argument("--ramp", default=None, help="Ramp name (standard, extended) or custom characters")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum queued conversions (default: 2x workers)")
+    parser.add_argument("--dark", action="store_true", help="Render PNGs in dark mode")
+    parser.add_argument("--fast-load", action="store_true",
+                        help="Decode large inputs at reduced resolution (faster, text can differ slightly)")
+    parser.add_argument("--no-txt", action="store_true", help="Skip writing .txt files")
+    parser.add_argument("--no-png", action="store_true", help="Skip writing .png files")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse conversions from a content-addressed cache in this directory")
+    parser.add_argument("--cache-max-mb", type=float, default=conversion_cache.DEFAULT_MAX_BYTES / (1024 * 1024))
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a per-stage time breakdown summed over all workers")
+    parser.add_argument("-f", "--force", action="store_true", help="Reconvert files that are up to date")
+    args = parser.parse_args(argv)
+
+    if not args.sources and not args.manifest:
+        parser.error("no inputs given")
+    if args.no_txt and args.no_png:
+        parser.error("nothing to write: both --no-txt and --no-png given")
+
+    try:
+        entries = collect_inputs(args.sources, args.manifest)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if not entries:
+        print("No input images found", file=sys.stderr)
+        return 1
+
+    stats = run_batch(entries, args.output_dir, width=args.width, ramp=args.ramp,
+                      workers=args.workers, max_in_flight=args.max_in_flight,
+                      is_dark_mode=args.dark, write_txt=not args.no_txt,
+                      write_png=not args.no_png, force=args.force, cache_dir=args.cache_dir,
+                      cache_max_bytes=int(args.cache_max_mb * 1024 * 1024), profile=args.profile,
+                      fast_load=args.fast_load)
+    print(format_summary(stats))
+    if args.profile and stats["stages"].totals:
+        print(stats["stages"].report())
+    return 1 if stats["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
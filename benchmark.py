@@ -0,0 +1,548 @@
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import PIL
+from PIL import Image
+from PIL import ImageDraw, ImageFont
+import animated_art
+import color_art
+import dithering
+import export_formats
+import glyph_atlas
+import glyph_match
+import incremental_figlet
+import img_art
+import pyramid
+import resources
+
+# Original per-pixel loop, kept here as the baseline for comparison
+def legacy_image_to_ascii(image_path, new_width=100):
+    img = Image.open(image_path)
+    width, height = img.size
+    aspect_ratio = height / width
+    new_height = int(aspect_ratio * new_width)
+    img = img.resize((new_width, new_height))
+    img = img.convert("L")
+    return legacy_map_pixels(np.array(img))
+
+def time_call(func, *args, repeat=5, **kwargs):
+    # Best-of-N wall time in seconds
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def legacy_map_pixels(pixels):
+    ascii_chars = ["@", "#", "S", "%", "?", "*", "+", ";", ":", ",", "."]
+    ascii_image = ""
+    for row in pixels:
+        for pixel in row:
+            ascii_image += ascii_chars[pixel // 25]
+        ascii_image += "\n"
+    return ascii_image
+
+def bench_lookup_table(image_path="cat.jpg", widths=(100, 300, 600)):
+    # End-to-end time includes decode and resize; the map columns isolate the glyph mapping
+    print(f"{'width':>6} {'loop (ms)':>10} {'lookup (ms)':>12} "
+          f"{'map loop (ms)':>14} {'map lookup (ms)':>16} {'map speedup':>12}")
+    for width in widths:
+        expected = legacy_image_to_ascii(image_path, width)
+        if img_art.image_to_ascii(image_path, width) != expected:
+            raise AssertionError(f"Output mismatch at width {width}")
+        img = Image.open(image_path)
+        img = img.resize((width, int(img.size[1] / img.size[0] * width))).convert("L")
+        pixels = np.array(img)
+        loop_time = time_call(legacy_image_to_ascii, image_path, width)
+        lookup_time = time_call(img_art.image_to_ascii, image_path, width)
+        map_loop = time_call(legacy_map_pixels, pixels)
+        map_lookup = time_call(img_art.pixels_to_ascii, pixels)
+        print(f"{width:>6} {loop_time * 1000:>10.1f} {lookup_time * 1000:>12.1f} "
+              f"{map_loop * 1000:>14.2f} {map_lookup * 1000:>16.2f} {map_loop / map_lookup:>11.1f}x")
+
+# Original line-by-line renderer, kept as the baseline for the glyph atlas
+def legacy_render(ascii_art, font, char_width, char_height, padding, bg_color, text_color):
+    lines = ascii_art.split("\n")
+    max_line_length = max(len(line) for line in lines)
+    width = int(max_line_length * char_width) + padding * 2
+    height = int(len(lines) * char_height) + padding * 2
+    img = Image.new("RGB", (width, height), bg_color)
+    draw = ImageDraw.Draw(img)
+    y = padding
+    for line in lines:
+        if line.strip():
+            draw.text((padding, y), line, font=font, fill=text_color)
+        y += char_height
+    return img
+
+def bench_renderer(image_path="cat.jpg", widths=(100, 300, 600), font_path=None):
+    font = ImageFont.truetype(font_path, 15) if font_path else ImageFont.load_default()
+    settings = (font, 9.0, 13.5, 40, (255, 255, 255), (102, 102, 102))
+    print(f"{'width':>6} {'draw.text (ms)':>15} {'atlas (ms)':>11} {'speedup':>8} {'mean abs diff':>14}")
+    for width in widths:
+        ascii_art = img_art.image_to_ascii(image_path, width)
+        glyph_atlas.render_ascii(ascii_art, *settings)  # Warm the atlas cache
+        legacy_time = time_call(legacy_render, ascii_art, *settings, repeat=3)
+        atlas_time = time_call(glyph_atlas.render_ascii, ascii_art, *settings, repeat=3)
+        diff = np.abs(np.asarray(legacy_render(ascii_art, *settings), dtype=np.int16)
+                      - np.asarray(glyph_atlas.render_ascii(ascii_art, *settings), dtype=np.int16)).mean()
+        print(f"{width:>6} {legacy_time * 1000:>15.1f} {atlas_time * 1000:>11.1f} "
+              f"{legacy_time / atlas_time:>7.1f}x {diff:>14.3f}")
+
+def make_test_jpeg(path, width=6000, height=4000):
+    # Smooth synthetic photo-like content, ~24 megapixels by default
+    x = np.linspace(0, 8 * np.pi, width, dtype=np.float32)
+    y = np.linspace(0, 6 * np.pi, height, dtype=np.float32)[:, None]
+    base = (np.sin(x) * np.cos(y) * 0.5 + 0.5) * 255
+    rgb = np.stack([base, base[::-1], np.broadcast_to(x / x.max() * 255, base.shape)], axis=-1)
+    Image.fromarray(rgb.astype(np.uint8)).save(path, quality=90)
+
+def measure_in_subprocess(code, setup=""):
+    # Run code in a fresh interpreter and return (seconds, peak RSS in MB). setup runs
+    # first; on Linux the peak is reset after it, so only code's peak above the memory
+    # setup left allocated counts.
+    script = (
+        "import resource, sys, time\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "import img_art\n"
+        f"{setup}\n"
+        "try:\n"
+        "    with open('/proc/self/clear_refs', 'w') as f:\n"
+        "        f.write('5')\n"
+        "except OSError:\n"
+        "    pass\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "rss = rss / 1024 if sys.platform != 'darwin' else rss / 1024 / 1024\n"
+        "try:\n"
+        # ru_maxrss survives exec on Linux and would report the parent's peak
+        "    hwm = [l for l in open('/proc/self/status') if l.startswith('VmHWM')][0]\n"
+        "    rss = int(hwm.split()[1]) / 1024\n"
+        "except OSError:\n"
+        "    pass\n"
+        "print(elapsed, rss)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    seconds, rss_mb = output.stdout.split()
+    return float(seconds), float(rss_mb)
+
+def bench_fast_load(widths=(100, 300, 600)):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "large.jpg")
+        make_test_jpeg(path)
+        print(f"24 MP JPEG ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+        print(f"{'width':>6} {'full (ms)':>10} {'full RSS (MB)':>14} {'fast (ms)':>10} {'fast RSS (MB)':>14}")
+        for width in widths:
+            full = measure_in_subprocess(f"img_art.image_to_ascii({path!r}, {width})")
+            fast = measure_in_subprocess(f"img_art.image_to_ascii({path!r}, {width}, fast_load=True)")
+            print(f"{width:>6} {full[0] * 1000:>10.1f} {full[1]:>14.1f} {fast[0] * 1000:>10.1f} {fast[1]:>14.1f}")
+
+def check_image_modes(width=100):
+    # Palette, bilevel and 16-bit inputs large enough to take the fast-load reduce step
+    # must convert in both load paths, to text and to color
+    gradient = np.tile(np.linspace(0, 255, width * 8), (width * 4, 1)).astype(np.uint8)
+    images = {
+        "P": Image.fromarray(gradient).convert("RGB").quantize(64),
+        "1": Image.fromarray(gradient).convert("1"),
+        "I;16": Image.fromarray(gradient.astype(np.uint16) * 257, "I;16"),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, img in images.items():
+            path = os.path.join(tmp, f"mode_{mode.replace(';', '_')}.png")
+            img.save(path)
+            for fast_load in (False, True):
+                ascii_art = img_art.image_to_ascii(path, width, fast_load=fast_load)
+                color_art.image_to_color_ascii(path, width, fast_load=fast_load)
+                if len(ascii_art.split("\n")[0]) != width:
+                    raise AssertionError(f"Wrong width for mode {mode} (fast_load={fast_load})")
+            print(f"mode {mode:<5} ok")
+
+def check_structure_gradient(width=100):
+    # A black-to-white gradient must come out as a monotone ramp over the whole glyph range
+    # in structure mode, from the densest glyph to the emptiest, for every metric
+    gradient = np.tile(np.linspace(0, 255, width * 8), (width * 4, 1)).astype(np.uint8)
+    coverage = glyph_match.build_glyph_matrix()[0].mean(axis=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "gradient.png")
+        Image.fromarray(gradient).save(path)
+        for metric in glyph_match.METRICS:
+            row = glyph_match.image_to_ascii_structure(path, width, metric=metric).split("\n")[0]
+            ink = coverage[[glyph_match.PRINTABLE_ASCII.index(c) for c in row]]
+            if np.diff(ink).max() > 0 or ink[0] < 0.9 * coverage.max() or ink[-1] > 0.1 * coverage.max():
+                raise AssertionError(f"Structure mode ({metric}) does not keep the gradient's range: {row}")
+            print(f"structure {metric:<12} ok  {row[:40]}...")
+
+def check_long_frames(width=40):
+    # A static 80 s GIF merges into one frame longer than the 65535 ms a millisecond
+    # APNG delay can hold; its duration must survive the round trip
+    frames = [Image.new("L", (width * 4, width * 2), 128) for _ in range(4)]
+    with tempfile.TemporaryDirectory() as tmp:
+        gif_path = os.path.join(tmp, "still.gif")
+        png_path = os.path.join(tmp, "still.png")
+        frames[0].save(gif_path, save_all=True, append_images=frames[1:], duration=20000, loop=0)
+        animated_art.write_apng(animated_art.AnimationConverter(gif_path, width), png_path)
+        with Image.open(png_path) as img:
+            if img.n_frames != 1 or img.info.get("duration") != 80000:
+                raise AssertionError(f"Merged frame written as {img.n_frames} frames of {img.info.get('duration')} ms")
+    print("long frame   ok")
+
+def bench_structure(image_path="cat.jpg", widths=(100, 300, 600)):
+    # End-to-end conversion; structure mode decodes 8x16 times more pixels and runs one
+    # (cells x 128) @ (128 x glyphs) product, so the ratio should stay a small constant
+    print(f"{'width':>6} {'simple (ms)':>12} {'mse (ms)':>10} {'corr (ms)':>10} {'mse ratio':>10} {'corr ratio':>11}")
+    for width in widths:
+        simple = time_call(img_art.image_to_ascii, image_path, width)
+        mse = time_call(glyph_match.image_to_ascii_structure, image_path, width)
+        corr = time_call(glyph_match.image_to_ascii_structure, image_path, width, metric="correlation")
+        print(f"{width:>6} {simple * 1000:>12.2f} {mse * 1000:>10.2f} {corr * 1000:>10.2f} "
+              f"{mse / simple:>9.1f}x {corr / simple:>10.1f}x")
+
+def bench_pyramid(image_path="cat.jpg", widths=(40, 100, 200, 400, 800)):
+    # Re-targeting a loaded image against a full reopen/decode/resize per width
+    start = time.perf_counter()
+    image = pyramid.LoadedImage(image_path)
+    load_time = time.perf_counter() - start
+    print(f"Pyramid load: {load_time * 1000:.1f} ms, {len(image.levels)} levels, "
+          f"{image.nbytes / 1024 / 1024:.1f} MB")
+    print(f"{'width':>6} {'reload (ms)':>12} {'retarget (ms)':>14} {'speedup':>8}")
+    for width in widths:
+        reload_time = time_call(img_art.image_to_ascii, image_path, width)
+        retarget_time = time_call(image.to_ascii, width)
+        print(f"{width:>6} {reload_time * 1000:>12.2f} {retarget_time * 1000:>14.2f} "
+              f"{reload_time / retarget_time:>7.1f}x")
+
+def dither_error(pixels, indices, ramp):
+    # Perceived error: RMS difference after a 3x3 box blur (roughly what the eye averages
+    # over) between the image and the gray level each chosen glyph stands for
+    count = len(img_art.get_ramp(ramp))
+    shown = (indices * (255 / max(count - 1, 1))).astype(np.float32)
+    def blur(a):
+        padded = np.pad(a, 1, mode="edge")
+        return sum(padded[y:y + a.shape[0], x:x + a.shape[1]] for y in range(3) for x in range(3)) / 9
+    return float(np.sqrt(np.mean((blur(pixels.astype(np.float32)) - blur(shown)) ** 2)))
+
+def bench_dither(image_path="cat.jpg", widths=(80, 200, 600), ramp="standard"):
+    # Mapping throughput and blurred error for each dither mode; the threshold maps are
+    # built before timing
+    for mode in dithering.DITHER_MODES[1:3]:
+        dithering.threshold_map(mode)
+    # A smooth gradient shows banding most clearly
+    sources = [(f"{os.path.basename(image_path)} w{width}", img_art.load_grayscale(image_path, width))
+               for width in widths]
+    sources.append(("gradient w200", np.tile(np.linspace(0, 255, 200).astype(np.uint8), (100, 1))))
+    print(f"{'input':<16} {'mode':<16} {'time (ms)':>10} {'Mpx/s':>8} {'error':>7}")
+    for name, pixels in sources:
+        for mode in dithering.DITHER_MODES:
+            elapsed = time_call(img_art.pixels_to_frame, pixels, ramp, mode)
+            indices = np.asarray(img_art.pixels_to_frame(pixels, ramp, mode))
+            print(f"{name:<16} {mode:<16} {elapsed * 1000:>10.2f} {pixels.size / elapsed / 1e6:>8.1f} "
+                  f"{dither_error(pixels, indices, ramp):>7.2f}")
+
+def bench_frame(image_path="cat.jpg", widths=(100, 300, 600), ramp="extended"):
+    # str pipeline against AsciiFrame: map pixels, render the PNG canvas, hold in memory
+    print(f"{'width':>6} {'map str (ms)':>13} {'map frame (ms)':>15} {'render str (ms)':>16} "
+          f"{'render frame (ms)':>18} {'str (KB)':>9} {'frame (KB)':>11}")
+    for width in widths:
+        pixels = img_art.load_grayscale(image_path, width)
+        ascii_art = img_art.pixels_to_ascii(pixels, ramp)
+        frame = img_art.pixels_to_frame(pixels, ramp)
+        map_str = time_call(img_art.pixels_to_ascii, pixels, ramp)
+        map_frame = time_call(img_art.pixels_to_frame, pixels, ramp)
+        render_str = time_call(img_art.render_ascii_image, ascii_art, repeat=3)
+        render_frame = time_call(img_art.render_ascii_image, frame, repeat=3)
+        print(f"{width:>6} {map_str * 1000:>13.2f} {map_frame * 1000:>15.2f} {render_str * 1000:>16.1f} "
+              f"{render_frame * 1000:>18.1f} {sys.getsizeof(ascii_art) / 1024:>9.1f} {frame.nbytes / 1024:>11.1f}")
+
+def bench_encoders(image_path="cat.jpg", width=300):
+    # Encode time against file size for every output format and PNG setting
+    ascii_art = img_art.image_to_ascii(image_path, width)
+    configs = [("png", "rgb", 6, False), ("png", "rgb", 1, False), ("png", "rgb", 9, True),
+               ("png", "palette", 6, False), ("png", "palette", 9, True), ("png", "1bit", 6, False),
+               ("png", "1bit", 9, True), ("webp", "rgb", 0, False), ("webp", "rgb", 6, False),
+               ("svg", "rgb", 6, False), ("pdf", "rgb", 6, False)]
+    print(f"Encoding {width} columns")
+    print(f"{'format':<7} {'mode':<8} {'level':>5} {'optimize':>8} {'time (ms)':>10} {'size (KB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for output_format, png_mode, level, optimize in configs:
+            path = os.path.join(tmp, "out." + output_format)
+            elapsed = time_call(export_formats.save_ascii, ascii_art, path, False, output_format,
+                                png_mode, level, optimize, repeat=3)
+            print(f"{output_format:<7} {png_mode:<8} {level:>5} {str(optimize):>8} {elapsed * 1000:>10.1f} "
+                  f"{os.path.getsize(path) / 1024:>10.1f}")
+
+def bench_incremental_figlet(fonts=("standard", "big", "banner3"), length=200):
+    # Simulates typing a banner one key at a time: full renderText per keystroke against
+    # the incremental renderer; every intermediate output must match
+    sample = "The quick brown fox jumps over the lazy dog. "
+    text = (sample * (length // len(sample) + 1))[:length]
+    print(f"Typing {length} characters")
+    print(f"{'font':<10} {'full (ms)':>10} {'incremental (ms)':>17} {'last key full (ms)':>19} "
+          f"{'last key incr (ms)':>19} {'speedup':>8}")
+    for font in fonts:
+        figlet = resources.get_figlet(font)
+        renderer = incremental_figlet.IncrementalFiglet(figlet)
+        full_total = incremental_total = 0.0
+        for i in range(1, length + 1):
+            start = time.perf_counter()
+            expected = figlet.renderText(text[:i])
+            full_last = time.perf_counter() - start
+            start = time.perf_counter()
+            result = renderer.render(text[:i])
+            incremental_last = time.perf_counter() - start
+            if result != expected:
+                raise AssertionError(f"Output mismatch for {font} after {i} characters")
+            full_total += full_last
+            incremental_total += incremental_last
+        print(f"{font:<10} {full_total * 1000:>10.1f} {incremental_total * 1000:>17.1f} "
+              f"{full_last * 1000:>19.2f} {incremental_last * 1000:>19.2f} "
+              f"{full_total / incremental_total:>7.1f}x")
+
+# Suite sweeps: synthetic sizes in megapixels, output widths, ramps and Figlet inputs
+SUITE_MEGAPIXELS = (0.1, 1, 12, 50)
+SUITE_WIDTHS = (80, 200, 500, 1000)
+SUITE_RAMPS = ("standard", "extended")
+SUITE_FONTS = ("standard", "slant", "big", "banner3", "doh")
+SUITE_TEXT_LENGTHS = (10, 50, 200)
+# Rendering cost grows with output area, so rasterization is only swept up to this width
+RENDER_MAX_WIDTH = 500
+
+def measure(func, *args, repeat=3, **kwargs):
+    # Best-of-N wall time, then one extra traced run for the Python/NumPy heap peak. Pillow
+    # allocates its decode and resize buffers outside tracemalloc, so they are not
+    # included; run_suite adds whole-process peak RSS from measure_in_subprocess.
+    seconds = time_call(func, *args, repeat=repeat, **kwargs)
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / (1024 * 1024)
+
+def make_synthetic_jpeg(path, megapixels):
+    width = int(math.sqrt(megapixels * 1e6 * 3 / 2))
+    make_test_jpeg(path, width, int(width * 2 / 3))
+
+def run_suite(image_paths, widths, ramps, fonts, text_lengths, repeat=3, log=print):
+    results = []
+
+    def record(case, stage, params, seconds, peak_heap_mb, peak_rss_mb, units, unit_name):
+        entry = {"case": case, "stage": stage, "params": params, "seconds": seconds,
+                 "throughput": units / seconds if seconds else 0.0, "throughput_unit": unit_name,
+                 "peak_heap_mb": peak_heap_mb, "peak_rss_mb": peak_rss_mb}
+        results.append(entry)
+        log(f"{case:<48} {stage:<8} {seconds * 1000:>10.2f} ms {entry['throughput']:>14.0f} "
+            f"{unit_name:<8} {peak_heap_mb:>8.1f} MB heap {peak_rss_mb:>8.1f} MB RSS")
+
+    def rss(code, setup=""):
+        # Whole-process peak, Pillow's buffers included, from one run in a fresh interpreter
+        return measure_in_subprocess(code, setup)[1]
+
+    for label, path in image_paths:
+        with Image.open(path) as img:
+            source_pixels = img.size[0] * img.size[1]
+        for width in widths:
+            decode = f"pixels = img_art.load_grayscale({path!r}, {width})"
+            pixels, seconds, peak = measure(img_art.load_grayscale, path, width, repeat=repeat)
+            record(f"{label} w={width}", "decode", {"image": label, "width": width},
+                   seconds, peak, rss(decode), source_pixels, "px/s")
+            for ramp in ramps:
+                ascii_art, seconds, peak = measure(img_art.pixels_to_ascii, pixels, ramp, repeat=repeat)
+                record(f"{label} w={width} ramp={ramp}", "map",
+                       {"image": label, "width": width, "ramp": ramp}, seconds, peak,
+                       rss(f"img_art.pixels_to_ascii(pixels, {ramp!r})", decode), pixels.size, "chars/s")
+            if width > RENDER_MAX_WIDTH:
+                continue
+            _, seconds, peak = measure(glyph_match.image_to_ascii_structure, path, width, repeat=repeat)
+            record(f"{label} w={width}", "structure", {"image": label, "width": width}, seconds, peak,
+                   rss(f"glyph_match.image_to_ascii_structure({path!r}, {width})", "import glyph_match"),
+                   pixels.size, "chars/s")
+            # Rendered from the last ramp's text, as below
+            mapped = f"{decode}\nascii_art = img_art.pixels_to_ascii(pixels, {ramps[-1]!r})"
+            img, seconds, peak = measure(img_art.render_ascii_image, ascii_art, repeat=repeat)
+            record(f"{label} w={width}", "render", {"image": label, "width": width}, seconds, peak,
+                   rss("img_art.render_ascii_image(ascii_art)", mapped), pixels.size, "chars/s")
+            _, seconds, peak = measure(lambda: img.save(io.BytesIO(), "PNG"), repeat=repeat)
+            record(f"{label} w={width}", "encode", {"image": label, "width": width}, seconds, peak,
+                   rss("img.save(io.BytesIO(), 'PNG')",
+                       f"import io\n{mapped}\nimg = img_art.render_ascii_image(ascii_art)"),
+                   img.size[0] * img.size[1], "px/s")
+
+    sample = "The quick brown fox jumps over the lazy dog. "
+    for font in fonts:
+        figlet = resources.get_figlet(font)
+        for length in text_lengths:
+            text = (sample * (length // len(sample) + 1))[:length]
+            _, seconds, peak = measure(figlet.renderText, text, repeat=repeat)
+            record(f"figlet {font} len={length}", "figlet", {"font": font, "length": length}, seconds, peak,
+                   rss(f"figlet.renderText({text!r})",
+                       f"import resources\nfiglet = resources.get_figlet({font!r})"),
+                   length, "chars/s")
+    return results
+
+def environment():
+    return {"python": platform.python_version(), "numpy": np.__version__, "pillow": PIL.__version__,
+            "platform": platform.platform(), "processor": platform.processor() or platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def compare_results(baseline, current, threshold=0.10):
+    # Returns rows of (case, stage, old seconds, new seconds, change, regressed)
+    old = {(r["case"], r["stage"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        key = (r["case"], r["stage"])
+        if key not in old:
+            continue
+        change = r["seconds"] / old[key]["seconds"] - 1 if old[key]["seconds"] else 0.0
+        rows.append((r["case"], r["stage"], old[key]["seconds"], r["seconds"], change, change > threshold))
+    return rows
+
+# Import-time budgets (ms, best of several runs) for the headless entry points; short-lived
+# CLI and serverless-style calls pay this on every invocation
+STARTUP_BUDGETS = {
+    "img_art": 60,
+    "conversion_cache": 80,
+    "export_formats": 80,
+    "pyramid": 60,
+    "batch": 120,
+    "server": 150,
+}
+# Must not be imported eagerly by any of them: Tk, and the heavy libraries that the
+# headless modules load lazily on first use
+STARTUP_FORBIDDEN = ("tkinter", "numpy", "PIL.Image", "pyfiglet")
+
+def measure_import(module, repeat=5):
+    # Best cumulative import time (ms) from python -X importtime, and every module it loaded
+    best = float("inf")
+    loaded = set()
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            name = name.strip()
+            loaded.add(name)
+            if name == module and cumulative.strip().isdigit():
+                best = min(best, int(cumulative) / 1000)
+    return best, loaded
+
+def bench_startup(budgets=STARTUP_BUDGETS, forbidden=STARTUP_FORBIDDEN, repeat=5):
+    # Returns the number of modules over budget or importing a forbidden module
+    failures = 0
+    print(f"{'module':<18} {'import (ms)':>12} {'budget (ms)':>12}  status")
+    for module, budget in budgets.items():
+        milliseconds, loaded = measure_import(module, repeat)
+        eager = [name for name in forbidden if name in loaded]
+        status = "ok"
+        if milliseconds > budget:
+            status = "OVER BUDGET"
+        if eager:
+            status = ("" if status == "ok" else status + ", ") + "imports " + ", ".join(eager)
+        failures += status != "ok"
+        print(f"{module:<18} {milliseconds:>12.1f} {budget:>12}  {status}")
+    return failures
+
+def legacy_main(font_path=None):
+    check_image_modes()
+    print()
+    check_structure_gradient()
+    print()
+    check_long_frames()
+    print()
+    bench_lookup_table()
+    print()
+    bench_fast_load()
+    print()
+    bench_structure()
+    print()
+    bench_pyramid()
+    print()
+    bench_incremental_figlet()
+    print()
+    bench_dither()
+    print()
+    bench_frame()
+    print()
+    bench_encoders()
+    print()
+    bench_renderer(font_path=font_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the conversion and render paths")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="Run the benchmark suite and save results as JSON")
+    run.add_argument("-o", "--output", default="bench_results.json")
+    run.add_argument("--quick", action="store_true", help="Small sweep for a fast sanity check")
+    run.add_argument("--image", action="append", default=[], help="Extra real image to include")
+    run.add_argument("--repeat", type=int, default=3)
+
+    compare = commands.add_parser("compare", help="Compare two result files and flag regressions")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10,
+                         help="Relative slowdown that counts as a regression (default 0.10)")
+
+    startup = commands.add_parser("startup", help="Check import times of the headless modules against budgets")
+    startup.add_argument("--repeat", type=int, default=5)
+
+    legacy = commands.add_parser("legacy", help="Compare against the original implementations")
+    legacy.add_argument("--font", default=None, help="TrueType font for the renderer comparison")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        rows = compare_results(baseline, current, args.threshold)
+        print(f"{'case':<48} {'stage':<8} {'old (ms)':>10} {'new (ms)':>10} {'change':>8}")
+        for case, stage, old, new, change, regressed in rows:
+            print(f"{case:<48} {stage:<8} {old * 1000:>10.2f} {new * 1000:>10.2f} {change:>+7.1%}"
+                  + ("  REGRESSION" if regressed else ""))
+        regressions = sum(1 for row in rows if row[-1])
+        print(f"{regressions} regression(s) above {args.threshold:.0%}")
+        return 1 if regressions else 0
+    if args.command == "startup":
+        failures = bench_startup(repeat=args.repeat)
+        print(f"{failures} module(s) over budget or importing forbidden modules")
+        return 1 if failures else 0
+    if args.command == "run":
+        megapixels = (0.1, 1) if args.quick else SUITE_MEGAPIXELS
+        widths = (80, 200) if args.quick else SUITE_WIDTHS
+        fonts = SUITE_FONTS[:2] if args.quick else SUITE_FONTS
+        lengths = SUITE_TEXT_LENGTHS[:2] if args.quick else SUITE_TEXT_LENGTHS
+        with tempfile.TemporaryDirectory() as tmp:
+            images = []
+            for mp in megapixels:
+                path = os.path.join(tmp, f"synthetic_{mp}mp.jpg")
+                make_synthetic_jpeg(path, mp)
+                images.append((f"synthetic {mp}MP", path))
+            real_images = args.image or (["cat.jpg"] if os.path.exists("cat.jpg") else [])
+            images += [(os.path.basename(path), path) for path in real_images]
+            results = run_suite(images, widths, SUITE_RAMPS, fonts, lengths, repeat=args.repeat)
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"Saved {len(results)} results to {args.output}")
+        return 0
+    legacy_main(getattr(args, "font", None))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import argparse
+import html
+import sys
+import numpy as np
+import glyph_atlas
+import img_art
+import resources
+
+RESET = "\x1b[0m"
+
+def image_to_color_ascii(image_path, new_width=100, ramp=None, fast_load=False):
+    # Returns the ASCII text plus a (rows, columns, 3) array with each character's color
+    rgb = img_art.load_resized(image_path, new_width, fast_load, "RGB")
+    # ITU-R 601-2 luma in the same fixed point Image.convert("L") uses
+    channels = rgb.astype(np.uint32)
+    luma = (channels[:, :, 0] * 19595 + channels[:, :, 1] * 38470 + channels[:, :, 2] * 7471 + 0x8000) >> 16
+    return img_art.pixels_to_ascii(luma.astype(np.uint8), ramp), rgb
+
+def quantize_colors(colors, levels=8):
+    # Snap each channel to `levels` evenly spaced values; fewer distinct colors means
+    # longer runs and therefore fewer escape sequences or spans
+    step = 256 / levels
+    centers = np.floor(np.arange(levels) * step + step / 2).astype(np.uint8)
+    return centers[(colors // step).astype(np.intp)]
+
+def rgb_to_ansi256(colors):
+    # Nearest entry in the xterm 6x6x6 color cube or the 24-step gray ramp
+    colors = colors.astype(np.int32)
+    cube_levels = np.array([0, 95, 135, 175, 215, 255])
+    cube_index = np.abs(colors[..., None] - cube_levels).argmin(axis=-1)
+    cube_rgb = cube_levels[cube_index]
+    cube_code = 16 + 36 * cube_index[..., 0] + 6 * cube_index[..., 1] + cube_index[..., 2]
+
+    gray = colors.mean(axis=-1)
+    gray_index = np.clip(np.round((gray - 8) / 10), 0, 23).astype(np.int32)
+    gray_value = 8 + 10 * gray_index
+    gray_code = 232 + gray_index
+
+    cube_error = ((colors - cube_rgb) ** 2).sum(axis=-1)
+    gray_error = ((colors - gray_value[..., None]) ** 2).sum(axis=-1)
+    return np.where(gray_error < cube_error, gray_code, cube_code)
+
+def _runs(keys):
+    # Start/end of every run of identical keys in each row: (row, start, end, key) arrays
+    rows, columns = keys.shape
+    change = np.ones((rows, columns), dtype=bool)
+    change[:, 1:] = keys[:, 1:] != keys[:, :-1]
+    row_index, start = np.nonzero(change)
+    flat = row_index * columns + start
+    end = np.empty_like(start)
+    end[:-1] = start[1:]
+    end[:-1][row_index[:-1] != row_index[1:]] = columns
+    end[-1] = columns
+    return row_index, start, end, keys.reshape(-1)[flat]
+
+def _concat(table, ids):
+    # "".join(table[i] for i in ids) as one gather over the table's UTF-32 code points:
+    # every output position looks up which piece it falls in and its offset inside it
+    lengths = np.array([len(piece) for piece in table], dtype=np.intp)
+    offsets = np.cumsum(lengths) - lengths
+    flat = np.frombuffer("".join(table).encode("utf-32-le"), dtype="<u4")
+    piece_lengths = lengths[ids]
+    piece_starts = np.cumsum(piece_lengths) - piece_lengths
+    index = np.arange(int(piece_lengths.sum())) + np.repeat(offsets[ids] - piece_starts, piece_lengths)
+    return flat[index].tobytes().decode("utf-32-le")
+
+def _coalesce(ascii_art, keys, openers, closer="", escape=None):
+    # Emit one opener per run of identical keys; openers[key] is precomputed per color.
+    # The output is laid out as piece ids (row by row: opener, the run's characters,
+    # closer for every run, then a newline) and assembled by _concat without a Python
+    # loop over runs; only distinct characters are escaped.
+    if not keys.size:
+        return ascii_art
+    rows, columns = keys.shape
+    codes = np.frombuffer(ascii_art.encode("utf-32-le"), dtype="<u4")[:rows * (columns + 1)]
+    codes = codes.reshape(rows, columns + 1)[:, :columns].reshape(-1)
+    # Dense code point table instead of np.unique, which would sort every character
+    present = np.zeros(int(codes.max()) + 1, dtype=bool)
+    present[codes] = True
+    chars = np.flatnonzero(present)
+    char_ids = (np.cumsum(present) - 1)[codes]
+    glyphs = [chr(c) for c in chars.tolist()]
+    if escape:
+        glyphs = [escape(glyph) for glyph in glyphs]
+    table = glyphs + list(openers) + [closer, "\n"]
+    opener_base, closer_id, newline_id = len(glyphs), len(table) - 2, len(table) - 1
+
+    row_index, start, end, run_keys = _runs(keys)
+    run = np.arange(len(run_keys))
+    is_start = np.zeros(keys.size, dtype=np.intp)
+    is_start[row_index * columns + start] = 1
+    cell = np.arange(keys.size)
+    cell_run = np.cumsum(is_start) - 1
+    runs_through_row = np.cumsum(np.bincount(row_index, minlength=rows))
+    row = np.arange(rows)
+
+    # Before a cell come its own and every earlier opener, the earlier closers and the
+    # newlines of earlier rows
+    ids = np.empty(keys.size + 2 * len(run_keys) + rows, dtype=np.intp)
+    ids[cell + 2 * cell_run + 1 + cell // columns] = char_ids
+    ids[row_index * columns + start + 2 * run + row_index] = opener_base + run_keys
+    ids[row_index * columns + end + 2 * run + 1 + row_index] = closer_id
+    ids[(row + 1) * columns + 2 * runs_through_row + row] = newline_id
+    return _concat(table, ids)
+
+def _pack(colors):
+    colors = colors.astype(np.int64)
+    return (colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]
+
+def to_ansi_truecolor(ascii_art, colors):
+    packed = _pack(colors)
+    unique, inverse = np.unique(packed, return_inverse=True)
+    openers = [f"\x1b[38;2;{c >> 16};{(c >> 8) & 255};{c & 255}m" for c in unique.tolist()]
+    return _coalesce(ascii_art, inverse.reshape(packed.shape), openers) + RESET
+
+def to_ansi_256(ascii_art, colors):
+    codes = rgb_to_ansi256(colors)
+    openers = [f"\x1b[38;5;{code}m" for code in range(256)]
+    return _coalesce(ascii_art, codes, openers) + RESET
+
+def to_html(ascii_art, colors, bg_color="#000000"):
+    packed = _pack(colors)
+    unique, inverse = np.unique(packed, return_inverse=True)
+    openers = [f'<span style="color:#{c:06x}">' for c in unique.tolist()]
+    body = _coalesce(ascii_art, inverse.reshape(packed.shape), openers, "</span>", html.escape)
+    return (f'<pre style="background:{bg_color};font-family:monospace;line-height:1">'
+            f"{body}</pre>\n")
+
+def render_color_png(ascii_art, colors, output_path, is_dark_mode=True):
+    # Same font and layout as img_art.save_ascii_to_png
+    font_size = 15
+    bg_color = (0, 0, 0) if is_dark_mode else (255, 255, 255)
+    img = glyph_atlas.render_ascii_colored(ascii_art, colors, resources.get_font(font_size),
+                                           font_size * 0.6, font_size * 0.9, 40, bg_color)
+    img.save(output_path, dpi=(300, 300))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert an image to colored ASCII art")
+    parser.add_argument("image")
+    parser.add_argument("-f", "--format", choices=["ansi", "ansi256", "html", "png"], default="ansi")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout for text formats)")
+    parser.add_argument("-w", "--width", type=int, default=100)
+    parser.add_argument("--ramp", default=None, help="Ramp name (standard, extended) or custom characters")
+    parser.add_argument("--levels", type=int, default=None,
+                        help="Quantize each channel to this many levels to merge more runs")
+    parser.add_argument("--fast-load", action="store_true", help="Decode large inputs at reduced resolution")
+    parser.add_argument("--light", action="store_true", help="Light background for html/png output")
+    args = parser.parse_args(argv)
+
+    ascii_art, colors = image_to_color_ascii(args.image, args.width, args.ramp, args.fast_load)
+    if args.levels:
+        colors = quantize_colors(colors, args.levels)
+
+    if args.format == "png":
+        if not args.output:
+            parser.error("png output needs --output")
+        render_color_png(ascii_art, colors, args.output, is_dark_mode=not args.light)
+        return 0
+    if args.format == "ansi":
+        result = to_ansi_truecolor(ascii_art, colors)
+    elif args.format == "ansi256":
+        result = to_ansi_256(ascii_art, colors)
+    else:
+        result = to_html(ascii_art, colors, "#ffffff" if args.light else "#000000")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(result)
+    else:
+        sys.stdout.write(result)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
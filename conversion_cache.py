@@ -0,0 +1,273 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import img_art
+import resources
+
+# Bump when conversion output changes so stale entries are never served
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ASCII_ART_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ascii-art"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Eviction walks the cache directory, so it runs once per this many writes
+EVICT_EVERY = 32
+# The hit/miss log is folded into one totals line once it grows past this size
+STATS_MAX_BYTES = 64 * 1024
+
+_file_hashes = {}
+_caches = {}
+
+def hash_file(path, chunk_size=1024 * 1024):
+    # Memoized per (path, mtime, size) so the text and PNG lookups hash a file only once
+    info = os.stat(path)
+    memo_key = (os.path.abspath(path), info.st_mtime_ns, info.st_size)
+    if memo_key in _file_hashes:
+        return _file_hashes[memo_key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+class ConversionCache:
+    # Entries live at <dir>/<key[:2]>/<key>.txt|.png. Writes go to a temporary file that
+    # is renamed into place, so concurrent workers never see a partial entry. Reads
+    # refresh the file mtime, which the size-bounded eviction uses as LRU order.
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._writes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, image_path, **params):
+        params["version"] = CACHE_VERSION
+        payload = hash_file(image_path) + json.dumps(params, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key, extension):
+        return os.path.join(self.cache_dir, key[:2], key + extension)
+
+    def _lookup(self, key, extension):
+        path = self._path(key, extension)
+        try:
+            os.utime(path)
+            return path
+        except OSError:
+            return None
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 1:
+            self.evict()
+
+    def get_text(self, key):
+        path = self._lookup(key, ".txt")
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put_text(self, key, text):
+        self._write_atomic(self._path(key, ".txt"), text.encode("utf-8"))
+
+    def get_png(self, key):
+        # Path to the cached PNG, or None
+        return self._lookup(key, ".png")
+
+    def put_png(self, key, png_path):
+        with open(png_path, "rb") as f:
+            self._write_atomic(self._path(key, ".png"), f.read())
+
+    def _stats_path(self):
+        return os.path.join(self.cache_dir, "stats.log")
+
+    def _append_stats(self, line):
+        # One short O_APPEND write per event is atomic on POSIX, so workers can share it
+        fd = os.open(self._stats_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("ascii"))
+        finally:
+            os.close(fd)
+
+    def record(self, hit, input_bytes=0, output_bytes=0):
+        self._append_stats(f"{'hit' if hit else 'miss'} {input_bytes} {output_bytes}\n")
+
+    def read_stats(self, path=None):
+        # (hits, misses, input bytes saved, output bytes served) summed over a stats log
+        hits = misses = input_saved = output_saved = 0
+        try:
+            with open(path or self._stats_path()) as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 5 and parts[0] == "total":
+                        hits += int(parts[1])
+                        misses += int(parts[2])
+                        input_saved += int(parts[3])
+                        output_saved += int(parts[4])
+                    elif len(parts) != 3:
+                        continue
+                    elif parts[0] == "hit":
+                        hits += 1
+                        input_saved += int(parts[1])
+                        output_saved += int(parts[2])
+                    else:
+                        misses += 1
+        except OSError:
+            pass
+        return hits, misses, input_saved, output_saved
+
+    def compact_stats(self):
+        # Moves the log aside (writers that open it afterwards start a new one), sums it
+        # and appends the totals as a single line, so the log stays a few KB
+        path = self._stats_path()
+        try:
+            if os.path.getsize(path) <= STATS_MAX_BYTES:
+                return
+            fd, old_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".log.tmp")
+            os.close(fd)
+            os.replace(path, old_path)
+        except OSError:
+            return
+        try:
+            self._append_stats("total %d %d %d %d\n" % self.read_stats(old_path))
+        finally:
+            os.unlink(old_path)
+
+    def entries(self):
+        # (mtime, size, path) for every cached file
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith((".txt", ".png")):
+                    path = os.path.join(root, name)
+                    try:
+                        info = os.stat(path)
+                    except OSError:
+                        continue
+                    found.append((info.st_mtime, info.st_size, path))
+        return found
+
+    def evict(self):
+        # The stats log counts towards max_bytes but is never evicted, only compacted
+        self.compact_stats()
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries) + self._stats_size()
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            if total <= self.max_bytes:
+                break
+        return removed
+
+    def _stats_size(self):
+        try:
+            return os.path.getsize(self._stats_path())
+        except OSError:
+            return 0
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def stats(self):
+        hits, misses, input_saved, output_saved = self.read_stats()
+        entries = self.entries()
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "input_bytes_saved": input_saved,
+            "output_bytes_served": output_saved,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries) + self._stats_size(),
+            "max_bytes": self.max_bytes,
+        }
+
+def get_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    # One instance per directory and process, so the write counter that spaces out
+    # evictions carries over between the files a batch worker converts
+    key = (os.path.abspath(cache_dir), max_bytes)
+    if key not in _caches:
+        _caches[key] = ConversionCache(cache_dir, max_bytes)
+    return _caches[key]
+
+def cached_image_to_ascii(cache, image_path, new_width=100, ramp=None, fast_load=False):
+    key = cache.make_key(image_path, width=new_width, ramp=img_art.get_ramp(ramp), fast_load=fast_load)
+    ascii_art = cache.get_text(key)
+    if ascii_art is not None:
+        cache.record(True, os.path.getsize(image_path), len(ascii_art))
+        return ascii_art
+    cache.record(False)
+    ascii_art = img_art.image_to_ascii(image_path, new_width, ramp, fast_load)
+    cache.put_text(key, ascii_art)
+    return ascii_art
+
+def cached_save_png(cache, image_path, ascii_art, output_path, new_width=100, ramp=None,
+                    is_dark_mode=True, fast_load=False):
+    # PNG entries are keyed by the source image plus every setting that affects the render
+    font_path = getattr(resources.get_font(15), "path", None)
+    key = cache.make_key(image_path, width=new_width, ramp=img_art.get_ramp(ramp),
+                         is_dark_mode=is_dark_mode, fast_load=fast_load,
+                         font=font_path if isinstance(font_path, str) else "default")
+    cached = cache.get_png(key)
+    if cached is not None:
+        shutil.copyfile(cached, output_path)
+        cache.record(True, 0, os.path.getsize(output_path))
+        return
+    cache.record(False)
+    img_art.save_ascii_to_png(ascii_art, output_path, is_dark_mode=is_dark_mode)
+    cache.put_png(key, output_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the conversion cache")
+    parser.add_argument("command", choices=["stats", "clear", "evict"])
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024))
+    args = parser.parse_args(argv)
+
+    cache = ConversionCache(args.cache_dir, int(args.max_mb * 1024 * 1024))
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared {args.cache_dir}")
+    elif args.command == "evict":
+        print(f"Evicted {cache.evict()} entries")
+    else:
+        stats = cache.stats()
+        print(f"Cache:        {args.cache_dir}")
+        print(f"Entries:      {stats['entries']} ({stats['size_bytes'] / 1024 / 1024:.1f} / "
+              f"{stats['max_bytes'] / 1024 / 1024:.0f} MB)")
+        print(f"Hit ratio:    {stats['hit_ratio']:.1%} ({stats['hits']} hits, {stats['misses']} misses)")
+        print(f"Bytes saved:  {stats['input_bytes_saved']} input bytes not re-decoded, "
+              f"{stats['output_bytes_served']} output bytes served from cache")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
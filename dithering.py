@@ -0,0 +1,87 @@
+from lazyload import lazy_import
+
+np = lazy_import("numpy")
+
+DITHER_MODES = ("none", "bayer", "blue-noise", "floyd-steinberg")
+BLUE_NOISE_SIZE = 64
+BLUE_NOISE_SIGMA = 1.5
+
+_threshold_maps = {}
+
+# All modes work in "level units": glyph i covers positions [i, i + 1) with its centre at
+# i + 0.5, and a pixel maps linearly to p = 0.5 + pixel * (count - 1) / 255, so black and
+# white land on the centres of the first and last glyphs and come out as solid runs of
+# them. Dithering moves pixels across floor(p) so that neighbourhoods average out to p
+# instead of banding.
+
+def bayer_matrix(size=8):
+    # Recursive Bayer index matrix, normalized to thresholds in (0, 1)
+    matrix = np.zeros((1, 1), dtype=np.float64)
+    while matrix.shape[0] < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return ((matrix + 0.5) / matrix.size).astype(np.float32)
+
+def blue_noise_matrix(size=BLUE_NOISE_SIZE, sigma=BLUE_NOISE_SIGMA, seed=0):
+    # Void-filling blue noise: points are placed one at a time in the largest void of
+    # those already placed (lowest Gaussian energy on a torus) and ranked in placement
+    # order, so every threshold level is spread evenly with no low-frequency structure.
+    # Built once per process (about 0.1 s for 64x64) and cached.
+    distance = np.minimum(np.arange(size), size - np.arange(size))
+    kernel = np.exp(-(distance[:, None] ** 2 + distance[None, :] ** 2) / (2 * sigma ** 2))
+    # A tiny random tilt decides ties, reproducibly
+    energy = np.random.default_rng(seed).random((size, size)) * 1e-6
+    ranks = np.empty((size, size), dtype=np.float64)
+    for rank in range(size * size):
+        y, x = np.unravel_index(np.argmin(energy), energy.shape)
+        ranks[y, x] = rank
+        energy += np.roll(kernel, (y, x), axis=(0, 1))
+        energy[y, x] = np.inf
+    return ((ranks + 0.5) / ranks.size).astype(np.float32)
+
+def threshold_map(mode):
+    if mode not in _threshold_maps:
+        _threshold_maps[mode] = bayer_matrix() if mode == "bayer" else blue_noise_matrix()
+    return _threshold_maps[mode]
+
+def ordered_dither(levels, count, mode="bayer"):
+    # levels is a float32 (h, w) array of ramp positions; the threshold map is tiled over
+    # the image and every pixel is quantized in one vectorized step
+    height, width = levels.shape
+    thresholds = threshold_map(mode)
+    tile_height, tile_width = thresholds.shape
+    tiled = np.tile(thresholds, (-(-height // tile_height), -(-width // tile_width)))[:height, :width]
+    return np.clip(np.floor(levels + tiled - 0.5), 0, count - 1).astype(np.uint8)
+
+def floyd_steinberg(levels, count):
+    # Exact Floyd-Steinberg, vectorized along wavefronts: pixel (y, x) only depends on
+    # pixels with a smaller x + 2y, so each anti-diagonal x + 2y = k is quantized and
+    # diffused in one set of array operations (width + 2 * height steps in total)
+    height, width = levels.shape
+    # Zero columns on both sides and a zero row below absorb error pushed off the edge
+    work = np.zeros((height + 1, width + 2), dtype=np.float32)
+    work[:height, 1:width + 1] = levels
+    out = np.empty((height, width), dtype=np.uint8)
+    for k in range(width + 2 * (height - 1)):
+        y = np.arange(max(0, (k - width + 2) // 2), min(height - 1, k // 2) + 1)
+        x = k - 2 * y + 1  # column in work
+        # Clamped to the range the glyphs can show (their centres), so error from areas
+        # darker or lighter than the end glyphs cannot pile up and smear into neighbours
+        value = np.clip(work[y, x], 0.5, count - 0.5)
+        index = np.floor(value)
+        out[y, x - 1] = index
+        error = value - index - 0.5
+        # Separate updates: within one wavefront two pixels can push to the same cell
+        work[y, x + 1] += error * (7 / 16)
+        work[y + 1, x - 1] += error * (3 / 16)
+        work[y + 1, x] += error * (5 / 16)
+        work[y + 1, x + 1] += error * (1 / 16)
+    return out
+
+def dither_indices(pixels, count, mode="bayer"):
+    # Ramp indices (uint8) for a 2D grayscale array; count is the ramp length
+    if mode not in DITHER_MODES or mode == "none":
+        raise ValueError(f"Dither mode must be one of {', '.join(DITHER_MODES[1:])}")
+    levels = np.asarray(pixels, dtype=np.float32) * np.float32((count - 1) / 255) + np.float32(0.5)
+    if mode == "floyd-steinberg":
+        return floyd_steinberg(levels, count)
+    return ordered_dither(levels, count, mode)
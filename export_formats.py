@@ -0,0 +1,119 @@
+import html
+import os
+import zlib
+import glyph_atlas
+import img_art
+import profiling
+
+# Output formats by file extension. PNG and WebP are rasterized from the glyph atlas;
+# SVG and PDF keep the characters as text, so their size follows the character count
+# instead of the pixel count and they stay sharp at any zoom.
+EXPORT_FORMATS = {
+    ".png": "png",
+    ".webp": "webp",
+    ".svg": "svg",
+    ".pdf": "pdf",
+}
+
+def _layout(ascii_art, is_dark_mode):
+    font, char_width, char_height, padding, bg_color, text_color = img_art.ascii_layout(is_dark_mode)
+    lines = str(ascii_art).split("\n")
+    columns = max((len(line) for line in lines), default=0)
+    width = int(columns * char_width + 2 * padding)
+    height = int(len(lines) * char_height + 2 * padding)
+    try:
+        ascent = font.getmetrics()[0]
+    except AttributeError:
+        ascent = font.getbbox("Mg|")[3]
+    return lines, width, height, char_width, char_height, padding, ascent, bg_color, text_color
+
+def _hex(color):
+    return "#%02x%02x%02x" % tuple(color)
+
+def save_webp(ascii_art, output_path, is_dark_mode=True, compress_level=6):
+    # Lossless, so no compression artifacts around the glyphs; the 0-9 level maps onto
+    # WebP's effort setting (method 0-6)
+    img = img_art.render_ascii_image(ascii_art, is_dark_mode)
+    with profiling.stage("encode"):
+        img.save(output_path, "WEBP", lossless=True, quality=100, method=min(6, compress_level * 6 // 9))
+
+def ascii_to_svg(ascii_art, is_dark_mode=True):
+    # One <text> element with a <tspan> per line, positioned like the PNG renderer
+    lines, width, height, char_width, char_height, padding, ascent, bg_color, text_color = \
+        _layout(ascii_art, is_dark_mode)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">\n',
+        f'<rect width="100%" height="100%" fill="{_hex(bg_color)}"/>\n',
+        f'<text xml:space="preserve" font-family="DejaVu Sans Mono, monospace" font-size="15" '
+        f'fill="{_hex(text_color)}">\n',
+    ]
+    for i, line in enumerate(lines):
+        if line.strip():
+            y = glyph_atlas.line_top(i, char_height, padding) + ascent
+            parts.append(f'<tspan x="{padding}" y="{y}">{html.escape(line, quote=False)}</tspan>\n')
+    parts.append("</text>\n</svg>\n")
+    return "".join(parts)
+
+def _pdf_string(line):
+    # Latin-1 text for the built-in Courier font; other characters become "?"
+    data = line.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+def ascii_to_pdf(ascii_art, is_dark_mode=True, compress_level=6):
+    # Single-page PDF with the text set in the standard Courier font, which every viewer
+    # has and whose 0.6 em advance matches the PNG's character width. One point per pixel.
+    lines, width, height, char_width, char_height, padding, ascent, bg_color, text_color = \
+        _layout(ascii_art, is_dark_mode)
+    bg = " ".join(f"{c / 255:.3f}" for c in bg_color)
+    fg = " ".join(f"{c / 255:.3f}" for c in text_color)
+    content = [
+        f"{bg} rg 0 0 {width} {height} re f".encode(),
+        f"BT /F1 15 Tf {char_height:g} TL {fg} rg {padding} {height - padding - ascent} Td".encode(),
+    ]
+    for line in lines:
+        content.append(_pdf_string(line) + b" Tj T*")
+    content.append(b"ET")
+    stream = zlib.compress(b"\n".join(content), compress_level)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+        f"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+        f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode() + stream + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def save_ascii(ascii_art, output_path, is_dark_mode=True, output_format=None, png_mode="rgb",
+               compress_level=6, optimize=False):
+    # Picks the format from output_format or the file extension (PNG when unknown)
+    if output_format is None:
+        output_format = EXPORT_FORMATS.get(os.path.splitext(output_path)[1].lower(), "png")
+    if output_format == "png":
+        img_art.save_ascii_to_png(ascii_art, output_path, is_dark_mode, png_mode, compress_level, optimize)
+    elif output_format == "webp":
+        save_webp(ascii_art, output_path, is_dark_mode, compress_level)
+    elif output_format == "svg":
+        with profiling.stage("encode"):
+            data = ascii_to_svg(ascii_art, is_dark_mode)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(data)
+    elif output_format == "pdf":
+        with profiling.stage("encode"):
+            data = ascii_to_pdf(ascii_art, is_dark_mode, compress_level)
+        with open(output_path, "wb") as f:
+            f.write(data)
+    else:
+        raise ValueError(f"Output format must be one of {', '.join(EXPORT_FORMATS.values())}")
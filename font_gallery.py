@@ -0,0 +1,144 @@
+import argparse
+import fnmatch
+import multiprocessing
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+DEFAULT_CHUNK_SIZE = 8
+# Cached (text, font) renders; about a dozen full galleries
+DEFAULT_MAX_RESULTS = 5000
+
+# Worker-side function: runs in the process pool, so it only takes and returns plain data
+
+def render_fonts(text, fonts):
+    # One pool task renders a chunk of fonts; (font, ascii_art, error, seconds) per font
+    import resources
+    results = []
+    for font in fonts:
+        try:
+            figlet = resources.get_figlet(font)
+            start = time.perf_counter()
+            ascii_art = figlet.renderText(text)
+            results.append((font, ascii_art, None, time.perf_counter() - start))
+        except Exception as e:
+            results.append((font, None, f"{type(e).__name__}: {e}", 0.0))
+    return results
+
+def list_fonts(pattern=None):
+    # All installed Figlet fonts, optionally filtered by a glob (e.g. "*3d*") or substring
+    import resources
+    fonts = resources.list_figlet_fonts()
+    if not pattern:
+        return fonts
+    if any(c in pattern for c in "*?["):
+        return [font for font in fonts if fnmatch.fnmatch(font, pattern)]
+    return [font for font in fonts if pattern.lower() in font.lower()]
+
+class FontGallery:
+    # Renders one text in many fonts across a process pool. Results are cached per
+    # (text, font), and the last render time of every font is kept so later runs schedule
+    # fast fonts first and galleries can be ordered by speed.
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, max_results=DEFAULT_MAX_RESULTS):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.render_times = {}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers, so a Tk interpreter in this process is never forked
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def order(self, fonts):
+        # Known-fast fonts first, fonts never rendered last (in their given order)
+        return sorted(fonts, key=lambda font: self.render_times.get(font, float("inf")))
+
+    def iter_results(self, text, fonts=None, cancel=None):
+        # Yields (font, ascii_art, error, seconds) as renders finish; cached ones first.
+        # Setting the cancel event stops the stream and drops the queued chunks.
+        fonts = self.order(list_fonts() if fonts is None else fonts)
+        pending = []
+        for font in fonts:
+            if (text, font) in self.results:
+                yield self.results[(text, font)]
+            else:
+                pending.append(font)
+        if not pending:
+            return
+        pool = self._get_pool()
+        futures = {pool.submit(render_fonts, text, pending[i:i + self.chunk_size])
+                   for i in range(0, len(pending), self.chunk_size)}
+        try:
+            while futures and not (cancel is not None and cancel.is_set()):
+                done, futures = wait(futures, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        if cancel is not None and cancel.is_set():
+                            return
+                        font, _, error, seconds = result
+                        self.results[(text, font)] = result
+                        while len(self.results) > self.max_results:
+                            self.results.popitem(last=False)
+                        if error is None:
+                            self.render_times[font] = seconds
+                        yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def render_all(self, text, fonts=None):
+        # Every result, fastest first; failed fonts at the end
+        results = list(self.iter_results(text, fonts))
+        return sorted(results, key=lambda r: (r[2] is not None, r[3]))
+
+    def clear(self):
+        self.results.clear()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a text in every installed Figlet font")
+    parser.add_argument("text")
+    parser.add_argument("--filter", default=None, help="Glob or substring to select fonts")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Fonts per pool task")
+    parser.add_argument("-o", "--output", help="Write the gallery to this file instead of stdout")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the timing summary")
+    args = parser.parse_args(argv)
+
+    fonts = list_fonts(args.filter)
+    if not fonts:
+        parser.error(f"No fonts match {args.filter!r}")
+    gallery = FontGallery(args.workers, args.chunk_size)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        # Printed in completion order, as the results stream in
+        for font, ascii_art, error, seconds in gallery.iter_results(args.text, fonts):
+            if not args.quiet:
+                out.write(f"=== {font} ({seconds * 1000:.1f} ms) ===\n{ascii_art if error is None else error}\n")
+    finally:
+        gallery.shutdown()
+        if args.output:
+            out.close()
+    failed = sum(1 for font in fonts if gallery.results[(args.text, font)][2] is not None)
+    print(f"{len(fonts)} fonts in {time.perf_counter() - start:.2f} s, {failed} failed", file=sys.stderr)
+    fastest = gallery.order(fonts)
+    print("Fastest: " + ", ".join(fastest[:5]), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
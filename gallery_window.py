@@ -0,0 +1,124 @@
+import bisect
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+import font_gallery
+
+# Queued by the feeder thread once it stops, however it stopped
+_DONE = object()
+
+class FontGalleryWindow(tk.Toplevel):
+    # Scrollable grid of one text rendered in every font. Renders run in the gallery's
+    # process pool; a background thread feeds finished results through a queue that the
+    # Tk thread drains with window.after, and each cell is slotted in render-time order.
+    # Clicking a cell hands its font to on_select.
+    def __init__(self, parent, gallery, text, on_select=None, columns=3, poll_ms=30):
+        super().__init__(parent)
+        self.title("Font Gallery")
+        self.geometry("1200x800")
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.gallery = gallery
+        self.text = text
+        self.on_select = on_select
+        self.columns = columns
+        self.poll_ms = poll_ms
+        self.cells = []  # (sort key, frame), kept sorted
+        self._results = queue.Queue()
+        self._cancel = threading.Event()
+        self._run = 0
+        self._expected = 0
+
+        # Font filter (glob such as *3d* or a plain substring)
+        top_frame = ttk.Frame(self)
+        top_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        ttk.Label(top_frame, text="Filter:").pack(side=tk.LEFT, padx=5)
+        self.filter_input = ttk.Entry(top_frame, width=30)
+        self.filter_input.pack(side=tk.LEFT, padx=5)
+        self.filter_input.bind('<Return>', lambda e: self.start(self.filter_input.get().strip()))
+        ttk.Button(top_frame, text="Apply",
+                   command=lambda: self.start(self.filter_input.get().strip())).pack(side=tk.LEFT, padx=5)
+        self.status_label = ttk.Label(top_frame, text="")
+        self.status_label.pack(side=tk.LEFT, padx=10)
+
+        # Canvas-hosted frame so the grid scrolls
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        y_scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.canvas.yview)
+        y_scrollbar.grid(row=1, column=1, sticky='ns')
+        self.canvas.configure(yscrollcommand=y_scrollbar.set)
+        self.inner = ttk.Frame(self.canvas)
+        self.canvas.create_window((0, 0), window=self.inner, anchor='nw')
+        self.inner.bind('<Configure>', lambda e: self.canvas.configure(scrollregion=self.canvas.bbox('all')))
+        self.canvas.bind('<MouseWheel>', lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.canvas.yview_scroll(-3, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.canvas.yview_scroll(3, 'units'))
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.start()
+
+    def start(self, pattern=None):
+        # A new run cancels the previous one; its late results are ignored by run number
+        self._cancel.set()
+        self._cancel = threading.Event()
+        self._run += 1
+        for _, frame in self.cells:
+            frame.destroy()
+        self.cells = []
+        fonts = font_gallery.list_fonts(pattern)
+        self._expected = len(fonts)
+        self.status_label.config(text=f"0/{len(fonts)} fonts")
+        threading.Thread(target=self._stream, args=(self._run, fonts, self._cancel), daemon=True).start()
+        self.after(self.poll_ms, self._poll, self._run)
+
+    def _stream(self, run, fonts, cancel):
+        try:
+            for result in self.gallery.iter_results(self.text, fonts, cancel):
+                self._results.put((run, result))
+        except Exception as e:
+            self._results.put((run, ("", None, f"{type(e).__name__}: {e}", 0.0)))
+        finally:
+            self._results.put((run, _DONE))
+
+    def _poll(self, run):
+        if run != self._run or not self.winfo_exists():
+            return
+        done = False
+        while True:
+            try:
+                result_run, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if result_run != run:
+                continue
+            if result is _DONE:
+                done = True
+            else:
+                self._add_cell(result)
+        self.status_label.config(text=f"{len(self.cells)}/{self._expected} fonts")
+        # Polling ends when the feeder thread has finished, even if it died part way
+        if not done:
+            self.after(self.poll_ms, self._poll, run)
+
+    def _add_cell(self, result):
+        font, ascii_art, error, seconds = result
+        frame = ttk.LabelFrame(self.inner, text=f"{font}  {seconds * 1000:.1f} ms")
+        label = tk.Label(frame, text=ascii_art if error is None else error, font=('Courier', 6),
+                         justify=tk.LEFT, anchor='nw', bg='white')
+        label.pack(fill=tk.BOTH, expand=True)
+        if self.on_select and error is None:
+            for widget in (frame, label):
+                widget.bind('<Button-1>', lambda e, font=font: self.on_select(font))
+
+        # Fastest first, failed fonts last; only cells after the new one move
+        key = (error is not None, seconds, font)
+        index = bisect.bisect([cell_key for cell_key, _ in self.cells], key)
+        self.cells.insert(index, (key, frame))
+        for i in range(index, len(self.cells)):
+            self.cells[i][1].grid(row=i // self.columns, column=i % self.columns, sticky="nsew", padx=4, pady=4)
+
+    def close(self):
+        self._cancel.set()
+        self.destroy()
@@ -0,0 +1,166 @@
+from lazyload import lazy_import
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageColor = lazy_import("PIL.ImageColor")
+ImageDraw = lazy_import("PIL.ImageDraw")
+
+_atlases = {}
+_color_tables = {}
+
+class GlyphAtlas:
+    # Every glyph is rasterized once into a fixed-size cell; index 0 is always blank
+    def __init__(self, font):
+        self.font = font
+        self.cell_width = max(1, int(round(font.getlength("M"))))
+        try:
+            ascent, descent = font.getmetrics()
+        except AttributeError:
+            ascent, descent = font.getbbox("Mg|")[3], 0
+        self.cell_height = max(1, ascent + descent)
+        self.glyphs = np.zeros((1, self.cell_height, self.cell_width), dtype=np.uint8)
+        self.index = {ord(" "): 0}
+
+    def _add_glyphs(self, codepoints):
+        new_glyphs = []
+        for codepoint in codepoints:
+            cell = Image.new("L", (self.cell_width, self.cell_height), 0)
+            ImageDraw.Draw(cell).text((0, 0), chr(codepoint), font=self.font, fill=255)
+            self.index[codepoint] = len(self.glyphs) + len(new_glyphs)
+            new_glyphs.append(np.asarray(cell))
+        self.glyphs = np.concatenate([self.glyphs, np.stack(new_glyphs)])
+
+    def index_grid(self, lines):
+        # Convert lines of text into a (rows, cols) grid of atlas indices; an AsciiFrame
+        # only needs its ramp looked up, then one fancy-index over its array
+        if not isinstance(lines, list):
+            return self.index_grid([lines.ramp])[0][lines.indices]
+        columns = max((len(line) for line in lines), default=0)
+        if not lines or not columns:
+            return np.zeros((len(lines), 0), dtype=np.intp)
+        padded = "".join(line.ljust(columns) for line in lines)
+        codepoints = np.frombuffer(padded.encode("utf-32-le"), dtype="<u4")
+        unique, inverse = np.unique(codepoints, return_inverse=True)
+        missing = [int(c) for c in unique if int(c) not in self.index]
+        if missing:
+            self._add_glyphs(missing)
+        lookup = np.array([self.index[int(c)] for c in unique], dtype=np.intp)
+        return lookup[inverse].reshape(len(lines), columns)
+
+def get_atlas(font):
+    # One atlas per (font file, size); fonts loaded from memory share a single key
+    path = getattr(font, "path", None)
+    key = (path if isinstance(path, str) else "default", getattr(font, "size", None))
+    if key not in _atlases:
+        _atlases[key] = GlyphAtlas(font)
+    return _atlases[key]
+
+def get_color_table(bg_color, text_color):
+    # Maps glyph coverage (0-255) to the blended output color
+    key = (bg_color, text_color)
+    if key not in _color_tables:
+        bg = np.array(ImageColor.getrgb(bg_color) if isinstance(bg_color, str) else bg_color[:3], dtype=np.float64)
+        fg = np.array(ImageColor.getrgb(text_color) if isinstance(text_color, str) else text_color[:3], dtype=np.float64)
+        alpha = np.arange(256, dtype=np.float64)[:, None] / 255
+        _color_tables[key] = np.round(bg + (fg - bg) * alpha).astype(np.uint8)
+    return _color_tables[key]
+
+def split_lines(ascii_art):
+    # Text is split at newlines; an AsciiFrame is already a grid of rows
+    return ascii_art.split("\n") if isinstance(ascii_art, str) else ascii_art
+
+def render_coverage(lines, font, char_width, char_height, padding, out=None):
+    # Builds a grayscale coverage canvas with the same layout as drawing each line with
+    # ImageDraw.text at (padding, padding + row * char_height). out is an optional canvas
+    # from an earlier call to draw into again (animations reuse one per frame size).
+    if isinstance(lines, list):
+        max_line_length = max((len(line) for line in lines), default=0)
+        line_count = len(lines)
+    else:
+        max_line_length, line_count = lines.width, lines.line_count
+    width = int(max_line_length * char_width) + padding * 2
+    height = int(line_count * char_height) + padding * 2
+    return render_coverage_band(lines, 0, font, char_width, char_height, padding, width, 0, height, out)
+
+def line_top(line, char_height, padding):
+    # Canvas row where a line's glyph cells start; same rounding as render_coverage_band
+    return int(padding + line * char_height)
+
+def render_coverage_band(lines, first_line, font, char_width, char_height, padding, width, y0, y1, out=None):
+    # Canvas rows y0..y1 of the full layout, where lines[0] is line number first_line of
+    # the whole text and width is the full canvas width. lines must include every line
+    # whose cells touch the band; lines outside it are simply cropped away.
+    atlas = get_atlas(font)
+    grid = atlas.index_grid(lines)
+    rows, columns = grid.shape
+    cell_height, cell_width = atlas.cell_height, atlas.cell_width
+    if not rows or not columns:
+        return np.zeros((y1 - y0, width), dtype=np.uint8)
+
+    tops = (padding + np.arange(first_line, first_line + rows) * char_height).astype(np.intp)
+    # The local canvas spans every cell touched, so glyphs that overhang the band on
+    # either side land in rows that are cropped at the end
+    origin = min(y0, int(tops[0]))
+    shape = (max(y1, int(tops[-1]) + cell_height) - origin, width)
+    if out is not None and out.shape == shape:
+        coverage = out
+        coverage.fill(0)
+    else:
+        coverage = np.zeros(shape, dtype=np.uint8)
+    tops -= origin
+
+    # One fancy-index produces every row strip: (rows, cell_height, columns * cell_width)
+    strips = atlas.glyphs[grid].transpose(0, 2, 1, 3).reshape(rows, cell_height, columns * cell_width)
+    strip_width = min(strips.shape[2], width - padding)
+    strips = strips[:, :, :strip_width]
+
+    # Cells taller than the line spacing overlap the next row, so rows are composited in
+    # interleaved groups that never overlap each other
+    groups = max(1, int(np.ceil(cell_height / char_height)))
+    offsets = np.arange(cell_height)
+    for start in range(groups):
+        y = tops[start::groups, None] + offsets[None, :]
+        target = coverage[y, padding:padding + strip_width]
+        coverage[y, padding:padding + strip_width] = np.maximum(target, strips[start::groups])
+    return coverage[y0 - origin:y1 - origin]
+
+def render_ascii(ascii_art, font, char_width, char_height, padding, bg_color, text_color):
+    lines = split_lines(ascii_art)
+    coverage = render_coverage(lines, font, char_width, char_height, padding)
+    return Image.fromarray(get_color_table(bg_color, text_color)[coverage])
+
+def render_ascii_palette(ascii_art, font, char_width, char_height, padding, bg_color, text_color, colors=256):
+    # Same layout as render_ascii as a "P" image. With 256 colors the coverage values are
+    # the palette indices, so the decoded pixels equal render_ascii's; with 2 colors the
+    # antialiasing is thresholded away and Pillow writes a 1-bit PNG.
+    lines = split_lines(ascii_art)
+    coverage = render_coverage(lines, font, char_width, char_height, padding)
+    table = get_color_table(bg_color, text_color)
+    if colors == 2:
+        img = Image.fromarray((coverage >= 128).astype(np.uint8))
+        img.putpalette(table[[0, 255]].tobytes())
+    else:
+        img = Image.fromarray(coverage)
+        img.putpalette(table.tobytes())
+    return img
+
+def render_ascii_colored(ascii_art, cell_colors, font, char_width, char_height, padding, bg_color):
+    # Same layout as render_ascii, but every character cell is tinted with its own color;
+    # cell_colors is a (rows, columns, 3) uint8 array
+    lines = split_lines(ascii_art)
+    coverage = render_coverage(lines, font, char_width, char_height, padding)
+    height, width = coverage.shape
+    bg = np.array(ImageColor.getrgb(bg_color) if isinstance(bg_color, str) else bg_color[:3], dtype=np.uint16)
+    rows, columns = cell_colors.shape[:2]
+    if not rows or not columns:
+        return Image.fromarray(np.broadcast_to(bg.astype(np.uint8), (height, width, 3)).copy())
+
+    # One fancy-index maps every output pixel to the color of the cell it belongs to
+    cell_width = get_atlas(font).cell_width
+    row_of_y = np.clip(((np.arange(height) - padding) / char_height).astype(np.intp), 0, rows - 1)
+    column_of_x = np.clip((np.arange(width) - padding) // cell_width, 0, columns - 1)
+    colors = cell_colors[row_of_y[:, None], column_of_x[None, :]].astype(np.uint16)
+
+    alpha = coverage[:, :, None].astype(np.uint16)
+    blended = (colors * alpha + bg * (255 - alpha) + 127) // 255
+    return Image.fromarray(blended.astype(np.uint8))
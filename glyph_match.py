@@ -0,0 +1,114 @@
+import numpy as np
+from PIL import Image
+import glyph_atlas
+import profiling
+import resources
+
+# Printable ASCII gives the matcher line and edge shapes such as / \ | _ - to pick from
+PRINTABLE_ASCII = "".join(chr(c) for c in range(32, 127))
+CELL_SIZE = (8, 16)
+METRICS = ("mse", "correlation")
+# Blocks whose ink standard deviation is below this are matched on mean ink alone
+FLAT_CONTRAST = 0.08
+# MSE compares blocks and glyphs box-reduced by this factor, roughly what the eye averages
+# over, plus TONE_WEIGHT times the squared mean ink difference per compared pixel. At full
+# resolution the squared error is dominated by each glyph's own pixel variance, so the
+# sparsest glyphs (space, |) would win every mid-tone block.
+MSE_POOL = 2
+TONE_WEIGHT = 16
+
+_glyph_matrices = {}
+
+def build_glyph_matrix(charset=PRINTABLE_ASCII, cell_size=CELL_SIZE, font_size=15):
+    # (glyphs, cell_w * cell_h) float32 ink coverage in 0..1, rasterized once per charset
+    key = (charset, cell_size, font_size)
+    if key in _glyph_matrices:
+        return _glyph_matrices[key]
+    atlas = glyph_atlas.get_atlas(resources.get_font(font_size))
+    grid = atlas.index_grid([charset])[0]
+    rows = []
+    for index in grid:
+        cell = Image.fromarray(atlas.glyphs[index]).resize(cell_size, Image.Resampling.BOX)
+        rows.append(np.asarray(cell, dtype=np.float32).reshape(-1) / 255)
+    matrix = np.stack(rows)
+    # Block ink runs from 0 to 1, but even the densest glyph covers only about a quarter
+    # of its cell. Stretch by the densest glyph's mean coverage so it stands for a solid
+    # black block, and lighter glyphs for proportionally lighter ones; otherwise every
+    # block over about 25% ink would match the densest glyph.
+    matrix /= max(matrix.mean(axis=1).max(), 1e-6)
+    # Zero-mean, unit-norm copies for the correlation metric
+    centered = matrix - matrix.mean(axis=1, keepdims=True)
+    centered /= np.maximum(np.linalg.norm(centered, axis=1, keepdims=True), 1e-6)
+    _glyph_matrices[key] = (matrix, smooth_glyphs(matrix, cell_size), centered)
+    return _glyph_matrices[key]
+
+def pool_size(cell_size):
+    return MSE_POOL if cell_size[0] % MSE_POOL == 0 and cell_size[1] % MSE_POOL == 0 else 1
+
+def smooth_glyphs(matrix, cell_size):
+    # Every pixel replaced by the mean of its pool_size box, still at full resolution: a
+    # block's product with these rows is its pooled product with the pooled glyphs (times
+    # the box area), so pooling costs nothing per block
+    cell_width, cell_height = cell_size
+    k = pool_size(cell_size)
+    boxes = matrix.reshape(-1, cell_height // k, k, cell_width // k, k).mean(axis=(2, 4), keepdims=True)
+    return np.broadcast_to(boxes, (len(matrix), cell_height // k, k, cell_width // k, k)).reshape(len(matrix), -1).copy()
+
+def match_blocks(pixels, columns, rows, charset=PRINTABLE_ASCII, cell_size=CELL_SIZE, metric="mse"):
+    # pixels is a (rows * cell_h, columns * cell_w) grayscale array; returns glyph indices
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    cell_width, cell_height = cell_size
+    matrix, smoothed, centered = build_glyph_matrix(charset, cell_size)
+    with profiling.stage("blocks"):
+        # One copy: uint8 cells straight into float32 rows of cell_h * cell_w pixels
+        blocks = np.empty((rows, columns, cell_height, cell_width), dtype=np.float32)
+        blocks[...] = pixels.reshape(rows, cell_height, columns, cell_width).transpose(0, 2, 1, 3)
+        blocks = blocks.reshape(rows * columns, cell_height * cell_width)
+    with profiling.stage("match"):
+        # Block ink is b = 1 - p / 255, folded into the weights so the pixels are used as-is
+        if metric == "mse":
+            # On the pooled n-pixel rows, with c the glyph's mean ink and m the block's:
+            # argmin ||b - g||^2 + w n (m - c)^2
+            #   == argmin ||g||^2 - 2 sum(g) + 2 p.g / 255 + w n (c^2 - 2c) + 2 w n c mean(p) / 255
+            # Pooled products are full-resolution products with the smoothed glyphs / area
+            area = pool_size(cell_size) ** 2
+            n = smoothed.shape[1] / area
+            coverage = matrix.mean(axis=1)
+            scores = blocks @ (smoothed.T * (2 / 255 / area))
+            scores += blocks.mean(axis=1, keepdims=True) * (coverage * (2 * TONE_WEIGHT * n / 255))
+            scores += (((smoothed ** 2).sum(axis=1) - 2 * smoothed.sum(axis=1)) / area
+                       + TONE_WEIGHT * n * (coverage ** 2 - 2 * coverage))
+            best = scores.argmin(axis=1)
+        else:
+            # Centered glyphs sum to zero, so b.g == -p.g / 255; the block's own mean and
+            # norm do not change which glyph wins, so blocks never need normalizing
+            best = (blocks @ centered.T).argmin(axis=1)
+        # Low-contrast blocks carry no usable shape (only noise), and against a flat block
+        # MSE favours the glyphs with the least variance, such as space and |, whatever its
+        # ink; these blocks fall back to the glyph with the closest mean ink
+        flat = np.flatnonzero(blocks.std(axis=1) < FLAT_CONTRAST * 255)
+        if flat.size:
+            ink = 1 - blocks[flat].mean(axis=1) / 255
+            best[flat] = np.abs(ink[:, None] - matrix.mean(axis=1)[None, :]).argmin(axis=1)
+        return best.reshape(rows, columns)
+
+def image_to_ascii_structure(image_path, new_width=100, charset=PRINTABLE_ASCII, cell_size=CELL_SIZE,
+                             metric="mse", fast_load=False):
+    # Same output dimensions as img_art.image_to_ascii, but each character is chosen by
+    # comparing its cell_size block of the image against every glyph bitmap
+    import img_art
+    with Image.open(image_path) as img:
+        width, height = img.size
+    if hasattr(image_path, "seek"):
+        image_path.seek(0)
+    rows = max(1, int(height / width * new_width))
+    cell_width, cell_height = cell_size
+    pixels = img_art.load_resized(image_path, new_width * cell_width, fast_load, "L", rows * cell_height)
+    indices = match_blocks(pixels, new_width, rows, charset, cell_size, metric)
+    with profiling.stage("map"):
+        codepoints = np.array([ord(c) for c in charset], dtype="<u4")
+        out = np.empty((rows, new_width + 1), dtype="<u4")
+        out[:, :new_width] = codepoints[indices]
+        out[:, new_width] = ord("\n")
+        return out.tobytes().decode("utf-32-le")
@@ -1,40 +1,166 @@
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
+import os
+import dithering
+import glyph_atlas
+import profiling
+import resources
+from ascii_frame import AsciiFrame
+from lazyload import lazy_import
 
-# Function to convert image to ASCII
-def image_to_ascii(image_path, new_width=100):
-    img = Image.open(image_path)
-    width, height = img.size
-    aspect_ratio = height / width
-    new_height = int(aspect_ratio * new_width)
-    img = img.resize((new_width, new_height))
-    img = img.convert("L")  # Convert to grayscale
-    pixels = np.array(img)
-    ascii_chars = ["@", "#", "S", "%", "?", "*", "+", ";", ":", ",", "."]
-    
-    ascii_image = ""
-    for row in pixels:
-        for pixel in row:
-            ascii_image += ascii_chars[pixel // 25]  # Mapping grayscale to ASCII
-        ascii_image += "\n"
-    
-    return ascii_image
+# Headless core: no Tk, and numpy/Pillow load on first use
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+# Character ramps, ordered from darkest to lightest
+ASCII_RAMPS = {
+    "standard": "@#S%?*+;:,.",
+    "extended": "$@B%8&WM#*oahkbdpqwmZO0QLCJUYXzcvunxrjft/\\|()1{}[]?-_+~<>i!lI;:,\"^`'. ",
+}
+DEFAULT_RAMP = "standard"
+
+_index_tables = {}
+_lookup_tables = {}
+
+def get_ramp(ramp=None):
+    # Accept a ramp name, a custom string/list of characters, or None for the default
+    if ramp is None:
+        ramp = DEFAULT_RAMP
+    if isinstance(ramp, str) and ramp in ASCII_RAMPS:
+        return ASCII_RAMPS[ramp]
+    ramp = "".join(ramp)
+    if not ramp:
+        raise ValueError("Character ramp must not be empty")
+    return ramp
+
+def build_index_table(ramp=None):
+    # Precompute the ramp position for every possible grayscale value (0-255)
+    ramp = get_ramp(ramp)
+    if ramp in _index_tables:
+        return _index_tables[ramp]
+    levels = np.arange(256)
+    if ramp == ASCII_RAMPS["standard"]:
+        indices = levels // 25  # Keep the original pixel // 25 buckets
+    else:
+        indices = levels * len(ramp) // 256
+    table = indices.astype(np.uint8)
+    _index_tables[ramp] = table
+    return table
 
-def save_ascii_to_png(ascii_art, output_path, is_dark_mode=True):
-    # Calculate dimensions
-    lines = ascii_art.split("\n")
-    line_count = len(lines)
-    max_line_length = max(len(line) for line in lines)
+def build_lookup_table(ramp=None):
+    # Precompute the glyph for every possible grayscale value (0-255)
+    ramp = get_ramp(ramp)
+    if ramp in _lookup_tables:
+        return _lookup_tables[ramp]
+    codepoints = np.array([ord(c) for c in ramp], dtype="<u4")
+    table = codepoints[build_index_table(ramp)]
+    _lookup_tables[ramp] = table
+    return table
+
+def dither_indices(pixels, ramp=None, dither="bayer"):
+    # Ramp indices with ordered (bayer, blue-noise) or error-diffusion (floyd-steinberg)
+    # dithering, so gradients between two glyphs blend instead of banding
+    ramp = get_ramp(ramp)
+    if len(ramp) > 256:
+        raise ValueError("Dithering supports ramps of up to 256 characters")
+    return dithering.dither_indices(pixels, len(ramp), dither)
+
+def pixels_to_ascii(pixels, ramp=None, dither=None):
+    # Map a 2D grayscale array to text in one step: lookup, append newlines, decode
+    with profiling.stage("map"):
+        table = build_lookup_table(ramp)
+        height, width = pixels.shape
+        out = np.empty((height, width + 1), dtype="<u4")
+        if dither and dither != "none":
+            codepoints = np.array([ord(c) for c in get_ramp(ramp)], dtype="<u4")
+            out[:, :width] = codepoints[dither_indices(pixels, ramp, dither)]
+        else:
+            out[:, :width] = table[pixels]
+        out[:, width] = ord("\n")
+        return out.tobytes().decode("utf-32-le")
+
+def pixels_to_frame(pixels, ramp=None, dither=None):
+    # Same mapping as pixels_to_ascii, kept as one byte per cell (ramps of up to 256 characters)
+    with profiling.stage("map"):
+        ramp = get_ramp(ramp)
+        if len(ramp) > 256:
+            raise ValueError("AsciiFrame ramps are limited to 256 characters")
+        if dither and dither != "none":
+            return AsciiFrame(dither_indices(pixels, ramp, dither), ramp)
+        return AsciiFrame(build_index_table(ramp)[pixels], ramp)
+
+def load_resized(image_path, new_width=100, fast_load=False, mode="L", new_height=None):
+    # Decode, resize and convert to a uint8 array of new_width columns in the given mode;
+    # new_height defaults to keeping the aspect ratio
+    with profiling.stage("decode"):
+        img = Image.open(image_path)
+    return resize_image(img, new_width, fast_load, mode, new_height)
+
+def resize_image(img, new_width=100, fast_load=False, mode="L", new_height=None):
+    # The load_resized pipeline for an already opened image (or one frame of an animation)
+    with profiling.stage("decode"):
+        width, height = img.size
+        aspect_ratio = height / width
+        if new_height is None:
+            new_height = int(aspect_ratio * new_width)
+        # Keep at least twice the target resolution so the final resize still antialiases
+        keep_width, keep_height = new_width * 2, max(1, new_height * 2)
+        if fast_load:
+            # JPEG: let the decoder scale by 1/2, 1/4 or 1/8 in the DCT (and emit luminance only)
+            img.draft(mode, (keep_width, keep_height))
+        img.load()
+    if not fast_load:
+        with profiling.stage("resize"):
+            img = img.resize((new_width, new_height))
+        with profiling.stage("grayscale"):
+            img = img.convert(mode)  # Convert to grayscale (or the requested mode)
+        return np.array(img)
     
+    with profiling.stage("resize"):
+        # Other formats: cheap integer box reduction before the real resize
+        factor = min(img.size[0] // keep_width, img.size[1] // keep_height)
+        if factor >= 2:
+            if img.mode in ("1", "P", "PA") or img.mode.startswith("I;16"):
+                # reduce rejects bilevel and 16-bit images, and averaging palette indices
+                # would mix unrelated colors, so these are converted first
+                with profiling.stage("grayscale"):
+                    img = img.convert(mode)
+            img = img.reduce(factor)
+    with profiling.stage("grayscale"):
+        img = img.convert(mode)
+    with profiling.stage("resize"):
+        img = img.resize((new_width, new_height))
+    return np.array(img)
+
+def load_grayscale(image_path, new_width=100, fast_load=False):
+    return load_resized(image_path, new_width, fast_load, "L")
+
+# Function to convert image to ASCII
+def image_to_ascii(image_path, new_width=100, ramp=None, fast_load=False, mode="simple", dither=None):
+    if mode == "structure":
+        if dither and dither != "none":
+            raise ValueError("Dithering applies to simple mode only")
+        # Match each character cell's shape against the glyph bitmaps instead of one pixel
+        import glyph_match
+        charset = get_ramp(ramp) if ramp is not None else glyph_match.PRINTABLE_ASCII
+        return glyph_match.image_to_ascii_structure(image_path, new_width, charset, fast_load=fast_load)
+    pixels = load_grayscale(image_path, new_width, fast_load)
+    return pixels_to_ascii(pixels, ramp, dither)
+
+def image_to_frame(image_path, new_width=100, ramp=None, fast_load=False, mode="simple", dither=None):
+    # image_to_ascii as an AsciiFrame; str(frame) gives the same text
+    if mode == "structure":
+        return AsciiFrame.from_text(image_to_ascii(image_path, new_width, ramp, fast_load, mode, dither))
+    return pixels_to_frame(load_grayscale(image_path, new_width, fast_load), ramp, dither)
+
+# PNG pixel layouts: full RGB, a 256-entry palette of the blended text colors (same
+# pixels, a third of the data) or a 2-entry palette written as a 1-bit PNG
+PNG_MODES = ("rgb", "palette", "1bit")
+
+def ascii_layout(is_dark_mode=True):
     # Font configuration
     font_size = 15  # Base font size
     char_width = font_size * 0.6  # Monospace character width
     char_height = font_size * 0.9  # Line height with spacing
-    
-    # Calculate image dimensions with padding
     padding = 40
-    width = int(max_line_length * char_width) + padding * 2
-    height = int(line_count * char_height) + padding * 2
     
     # Set colors based on mode
     if is_dark_mode:
@@ -44,36 +170,96 @@ def save_ascii_to_png(ascii_art, output_path, is_dark_mode=True):
         bg_color = (255, 255, 255)  # White background
         text_color = (102, 102, 102)  # Gray text
     
-    # Create image with calculated dimensions
-    img = Image.new("RGB", (width, height), bg_color)
-    draw = ImageDraw.Draw(img)
-    
-    # Try to load monospace font
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Courier.ttf", font_size)
-    except:
-        try:
-            font = ImageFont.truetype("/Library/Fonts/Courier New.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+    # Monospace font, discovered once and cached per size
+    font = resources.get_font(font_size)
+    return font, char_width, char_height, padding, bg_color, text_color
+
+def render_ascii_image(ascii_art, is_dark_mode=True, png_mode="rgb"):
+    if png_mode not in PNG_MODES:
+        raise ValueError(f"PNG mode must be one of {', '.join(PNG_MODES)}")
+    font, char_width, char_height, padding, bg_color, text_color = ascii_layout(is_dark_mode)
     
-    # Draw the ASCII art
-    y = padding  # Start from top padding
-    for line in lines:
-        if line.strip():  # Only draw non-empty lines
-            draw.text((padding, y), line, font=font, fill=text_color)
-        y += char_height
+    # Composite the ASCII art from pre-rasterized glyphs
+    with profiling.stage("rasterize"):
+        if png_mode == "rgb":
+            return glyph_atlas.render_ascii(ascii_art, font, char_width, char_height, padding,
+                                            bg_color, text_color)
+        return glyph_atlas.render_ascii_palette(ascii_art, font, char_width, char_height, padding,
+                                                bg_color, text_color, 2 if png_mode == "1bit" else 256)
+
+def save_ascii_to_png(ascii_art, output_path, is_dark_mode=True, png_mode="rgb", compress_level=6,
+                      optimize=False):
+    img = render_ascii_image(ascii_art, is_dark_mode, png_mode)
     
-    # Save the image with high quality
-    img.save(output_path, quality=95, dpi=(300, 300))
+    # Lower compress_level encodes faster; optimize searches for the smallest output
+    with profiling.stage("encode"):
+        img.save(output_path, quality=95, dpi=(300, 300), compress_level=compress_level, optimize=optimize)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert an image to ASCII art and save it as PNG")
+    parser.add_argument("image", nargs="?", default="cat.jpg", help="Input image path")
+    parser.add_argument("-o", "--output", default="ascii_art.png", help="Output path (.png, .webp, .svg or .pdf)")
+    parser.add_argument("-w", "--width", type=int, default=100)
+    parser.add_argument("--widths", default=None,
+                        help="Comma-separated widths to export from one decode, e.g. 80,160,320; "
+                             "each PNG gets a _w<width> suffix")
+    parser.add_argument("--ramp", default=None, help="Ramp name (standard, extended) or custom characters")
+    parser.add_argument("--dark", action="store_true", help="Save the PNG in dark mode")
+    parser.add_argument("--mode", choices=["simple", "structure"], default="simple",
+                        help="simple: one pixel per character; structure: match 8x16 blocks to glyph shapes")
+    parser.add_argument("--fast-load", action="store_true",
+                        help="Decode large inputs at reduced resolution; much faster, but the text "
+                             "can differ slightly from a full decode")
+    parser.add_argument("--dither", choices=dithering.DITHER_MODES, default="none",
+                        help="Dither the glyph mapping: ordered (bayer, blue-noise) or error diffusion "
+                             "(floyd-steinberg) to avoid banding at small widths")
+    parser.add_argument("--format", choices=["png", "webp", "svg", "pdf"], default=None,
+                        help="Output format (default: from the output extension)")
+    parser.add_argument("--png-mode", choices=PNG_MODES, default="rgb",
+                        help="rgb, palette (same pixels, smaller file) or 1bit (no antialiasing, smallest)")
+    parser.add_argument("--compress-level", type=int, choices=range(10), default=6, metavar="0-9",
+                        help="zlib level for PNG/PDF, effort for WebP; lower is faster")
+    parser.add_argument("--optimize", action="store_true", help="Search harder for the smallest PNG")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage time breakdown")
+    parser.add_argument("--cprofile", action="store_true", help="Print cProfile stats for the conversion")
+    parser.add_argument("--tracemalloc", action="store_true", help="Print allocation peak and top sites")
+    args = parser.parse_args(argv)
+    if args.mode == "structure" and args.dither != "none":
+        parser.error("--dither applies to --mode simple only")
+    if args.mode == "structure" and args.widths:
+        parser.error("--widths applies to --mode simple only")
+
+    import export_formats
+    def save(ascii_art, output_path):
+        export_formats.save_ascii(ascii_art, output_path, args.dark, args.format, args.png_mode,
+                                  args.compress_level, args.optimize)
+
+    timer = profiling.StageTimer()
+    if args.profile:
+        profiling.add_hook(timer)
+    with profiling.capture(args.cprofile, args.tracemalloc) as reports:
+        if args.widths:
+            import pyramid
+            stem, extension = os.path.splitext(args.output)
+            widths = [int(w) for w in args.widths.split(",")]
+            ascii_widths = pyramid.image_to_ascii_widths(args.image, widths, args.ramp, args.dither)
+            for width, ascii_art in ascii_widths.items():
+                save(ascii_art, f"{stem}_w{width}{extension}")
+        else:
+            # Convert image to ASCII (kept as a frame; the renderer indexes it directly)
+            ascii_art = image_to_frame(args.image, args.width, args.ramp, args.fast_load, args.mode,
+                                       args.dither)
+            # Save as PNG (or WebP, SVG, PDF)
+            save(ascii_art, args.output)
+    profiling.remove_hook(timer)
+
+    if args.profile:
+        print(timer.report())
+    for name in ("cprofile", "tracemalloc"):
+        if name in reports:
+            print(reports[name])
 
 # Example usage
 if __name__ == "__main__":
-    image_path = "cat.jpg"  # Input image path
-    output_path = "ascii_art.png"  # Output path for the PNG
-    
-    # Convert image to ASCII
-    ascii_art = image_to_ascii(image_path)
-    
-    # Save as PNG with dark mode
-    save_ascii_to_png(ascii_art, output_path, is_dark_mode=False)
\ No newline at end of file
+    main()
@@ -0,0 +1,110 @@
+import resources
+from lazyload import lazy_import
+
+pyfiglet = lazy_import("pyfiglet")
+
+class IncrementalFiglet:
+    # Drives pyfiglet's own FigletBuilder, but snapshots its state the first time it
+    # reaches each character. The builder only ever looks at characters it has already
+    # reached (word wrapping rewinds, never reads ahead), so the snapshot at index i
+    # depends on text[:i] alone. A new text resumes from the snapshot at the end of the
+    # prefix it shares with the previous one, so typing at the end of a long banner
+    # costs one character's worth of smushing instead of the whole string.
+    def __init__(self, figlet):
+        self.figlet = figlet
+        self.text = ""
+        self.snapshots = []
+        self.builder = None
+
+    @classmethod
+    def for_font(cls, font="standard"):
+        return cls(resources.get_figlet(font))
+
+    def _new_builder(self, text):
+        return pyfiglet.FigletBuilder(text, self.figlet.Font, self.figlet.direction,
+                                      self.figlet.width, self.figlet.justify)
+
+    def _save(self):
+        b = self.builder
+        # Strings are immutable and the lists in blankMarkers and the product queue are
+        # never modified after they are appended, so shallow copies are enough
+        self.snapshots.append((b.iterator, b.maxSmush, b.curCharWidth, b.prevCharWidth,
+                               b.currentTotalWidth, list(b.blankMarkers), list(b.buffer),
+                               list(b.product.queue)))
+
+    def _restore(self, index):
+        b = self.builder
+        (b.iterator, b.maxSmush, b.curCharWidth, b.prevCharWidth, b.currentTotalWidth,
+         blank_markers, buffer, queue) = self.snapshots[index]
+        b.blankMarkers = list(blank_markers)
+        b.buffer = list(buffer)
+        b.product.queue = list(queue)
+
+    def render(self, text):
+        # Same result as figlet.renderText(text)
+        common = 0
+        limit = min(len(text), len(self.text))
+        while common < limit and text[common] == self.text[common]:
+            common += 1
+
+        if self.builder is None or common == 0:
+            self.builder = self._new_builder(text)
+            self.snapshots = []
+        else:
+            resume = min(common, len(self.snapshots) - 1)
+            self._restore(resume)
+            del self.snapshots[resume:]
+            self.builder.text = [ord(c) for c in text]
+        self.text = text
+
+        b = self.builder
+        while b.isNotFinished():
+            # First visit of a character: everything before it is settled
+            if b.iterator == len(self.snapshots):
+                self._save()
+            b.addCharToProduct()
+            b.goToNextChar()
+        if b.iterator == len(self.snapshots):
+            self._save()
+        return self._product()
+
+    def _product(self):
+        # FigletBuilder.returnProduct, without touching the builder: justification edits
+        # buffers in place, so it works on copies
+        b = self.builder
+        queue = list(b.product.queue)
+        if b.buffer[0] != "":
+            queue.append(b.buffer)
+        return pyfiglet.FigletString("".join(b.replaceHardblanks(b.justifyString(b.justify, list(buffer)))
+                                             for buffer in queue))
+
+class IncrementalFigletCache:
+    # One incremental renderer per font; only used from a single render thread
+    def __init__(self):
+        self.renderers = {}
+
+    def render(self, text, font):
+        if font not in self.renderers:
+            self.renderers[font] = IncrementalFiglet.for_font(font)
+        return self.renderers[font].render(text)
+
+def update_text_widget(widget, old, new):
+    # Rewrites only what changed: for every line that differs, the columns after the
+    # part it shares with the old line; surplus old lines are deleted at the end
+    import tkinter as tk
+    old_lines = old.split("\n")
+    new_lines = new.split("\n")
+    for row, line in enumerate(new_lines[:len(old_lines)], start=1):
+        previous = old_lines[row - 1]
+        if line == previous:
+            continue
+        column = 0
+        limit = min(len(line), len(previous))
+        while column < limit and line[column] == previous[column]:
+            column += 1
+        widget.delete(f"{row}.{column}", f"{row}.end")
+        widget.insert(f"{row}.{column}", line[column:])
+    if len(new_lines) > len(old_lines):
+        widget.insert(tk.END, "\n" + "\n".join(new_lines[len(old_lines):]))
+    elif len(new_lines) < len(old_lines):
+        widget.delete(f"{len(new_lines)}.end", tk.END)
@@ -0,0 +1,19 @@
+import importlib.util
+import sys
+
+def lazy_import(name):
+    # Returns the module without running it; the real import happens on first attribute
+    # access. Lets the headless modules (img_art, glyph_atlas, resources, ...) keep
+    # module-level names like np and Image while a short-lived process that never
+    # touches them, such as a conversion cache hit, skips importing numpy and Pillow.
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+async def send_request(host, port, method, path, body=b""):
+    # Minimal HTTP/1.1 client: one connection per request, matching the server
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    status_line = response.split(b"\r\n", 1)[0].split()
+    return int(status_line[1]) if len(status_line) > 1 else 0, len(response)
+
+async def run_load(url, method, body, total, concurrency):
+    parts = urlsplit(url)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    latencies = []
+    statuses = {}
+    received = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, received
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                status, size = await send_request(parts.hostname, parts.port or 80, method, path, body)
+            except OSError:
+                status, size = "error", 0
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            received += size
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, statuses, received
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=["image", "text"], default="text")
+    parser.add_argument("--image", default="cat.jpg", help="Image to upload for --endpoint image")
+    parser.add_argument("--text", default="Hello World")
+    parser.add_argument("--font", default="standard")
+    parser.add_argument("--format", default="text", choices=["text", "ansi", "png"])
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    base = args.url.rstrip("/")
+    if args.endpoint == "image":
+        with open(args.image, "rb") as f:
+            body = f.read()
+        url = f"{base}/image?width={args.width}&format={args.format}"
+        method = "POST"
+    else:
+        body = b""
+        url = f"{base}/text?text={quote(args.text)}&font={quote(args.font)}&format={args.format}"
+        method = "GET"
+
+    elapsed, latencies, statuses, received = asyncio.run(
+        run_load(url, method, body, args.requests, args.concurrency))
+    ordered = sorted(latencies)
+    print(f"{len(latencies)} requests in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s, "
+          f"{received / elapsed / 1024 / 1024:.2f} MB/s received)")
+    print(f"Latency p50 {percentile(ordered, 0.5) * 1000:.1f} ms, p95 {percentile(ordered, 0.95) * 1000:.1f} ms, "
+          f"p99 {percentile(ordered, 0.99) * 1000:.1f} ms")
+    print("Status codes: " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import struct
+import zlib
+from lazyload import lazy_import
+
+np = lazy_import("numpy")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COLOR_TYPES = {"L": (0, 1), "RGB": (2, 3), "P": (3, 1)}
+# Compressed bytes are buffered up to this size before an IDAT chunk is written
+IDAT_SIZE = 256 * 1024
+
+def write_chunk(fileobj, tag, data):
+    fileobj.write(struct.pack(">I", len(data)) + tag + data
+                  + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+def write_header(fileobj, width, height, mode, palette=None):
+    # Signature, IHDR and (for "P") the PLTE chunk; palette is a (n, 3) uint8 array
+    if mode not in COLOR_TYPES:
+        raise ValueError(f"Unsupported PNG mode {mode}")
+    fileobj.write(PNG_SIGNATURE)
+    write_chunk(fileobj, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, COLOR_TYPES[mode][0], 0, 0, 0))
+    if mode == "P":
+        write_chunk(fileobj, b"PLTE", np.ascontiguousarray(palette, dtype=np.uint8).tobytes())
+
+def filter_rows(rows, width, channels):
+    # Prefixes every row with filter type None, returning the bytes to deflate
+    rows = np.ascontiguousarray(rows, dtype=np.uint8).reshape(len(rows), -1)
+    if rows.shape[1] != width * channels:
+        raise ValueError(f"Expected rows of {width} pixels")
+    filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 0
+    filtered[:, 1:] = rows
+    return filtered.tobytes()
+
+class PNGStreamWriter:
+    # Writes a PNG one band of rows at a time, so the full image never has to exist in
+    # memory. Rows are stored unfiltered: rendered ASCII art is mostly flat background and
+    # repeated glyph shapes, which deflate handles better without a prediction filter.
+    def __init__(self, fileobj, width, height, mode="RGB", dpi=None, compress_level=6, palette=None):
+        self.fileobj = fileobj
+        self.width = width
+        self.height = height
+        self.channels = COLOR_TYPES.get(mode, (0, 0))[1]
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(compress_level)
+        self.pending = []
+        self.pending_size = 0
+
+        write_header(fileobj, width, height, mode, palette)
+        if dpi:
+            # Pixels per metre, rounded the way Pillow writes it
+            self._chunk(b"pHYs", struct.pack(">IIB", int(dpi[0] / 0.0254 + 0.5), int(dpi[1] / 0.0254 + 0.5), 1))
+
+    def _chunk(self, tag, data):
+        write_chunk(self.fileobj, tag, data)
+
+    def _compressed(self, data, final=False):
+        if data:
+            self.pending.append(data)
+            self.pending_size += len(data)
+        if self.pending and (final or self.pending_size >= IDAT_SIZE):
+            self._chunk(b"IDAT", b"".join(self.pending))
+            self.pending = []
+            self.pending_size = 0
+
+    def write_rows(self, rows):
+        # rows is a (n, width) or (n, width, channels) uint8 array
+        data = filter_rows(rows, self.width, self.channels)
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("More rows than the declared image height")
+        if not len(rows):
+            return
+        self.rows_written += len(rows)
+        self._compressed(self.compressor.compress(data))
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+        self._compressed(self.compressor.flush(), final=True)
+        self._chunk(b"IEND", b"")
+
+def frame_delay(duration_ms):
+    # fcTL stores the delay as a u16 numerator over a u16 denominator. Milliseconds keep
+    # full precision up to about 65 s; longer frames (merged still stretches) fall back
+    # to centiseconds and then whole seconds, capped at about 18 hours.
+    duration_ms = max(0, int(round(duration_ms)))
+    for den in (1000, 100, 1):
+        num = int(round(duration_ms * den / 1000))
+        if num <= 0xFFFF:
+            return num, den
+    return 0xFFFF, 1
+
+class APNGStreamWriter:
+    # Animated PNG written one frame at a time, so only the current frame is ever in
+    # memory. Every frame covers the whole canvas and replaces the previous one. The
+    # frame count in acTL is patched in by close(), so fileobj must be seekable.
+    def __init__(self, fileobj, width, height, mode="RGB", palette=None, loop=0, compress_level=6):
+        self.fileobj = fileobj
+        self.width = width
+        self.height = height
+        self.channels = COLOR_TYPES.get(mode, (0, 0))[1]
+        self.compress_level = compress_level
+        self.loop = loop
+        self.frames = 0
+        self.sequence = 0
+        write_header(fileobj, width, height, mode, palette)
+        self.actl_offset = fileobj.tell()
+        write_chunk(fileobj, b"acTL", struct.pack(">II", 0, loop))
+
+    def write_frame(self, pixels, duration_ms):
+        # pixels is a (height, width) or (height, width, channels) uint8 array
+        if len(pixels) != self.height:
+            raise ValueError(f"Expected frames of {self.height} rows")
+        data = zlib.compress(filter_rows(pixels, self.width, self.channels), self.compress_level)
+        write_chunk(self.fileobj, b"fcTL", struct.pack(">IIIIIHHBB", self.sequence, self.width, self.height,
+                                                       0, 0, *frame_delay(duration_ms), 0, 0))
+        self.sequence += 1
+        if self.frames == 0:
+            write_chunk(self.fileobj, b"IDAT", data)
+        else:
+            write_chunk(self.fileobj, b"fdAT", struct.pack(">I", self.sequence) + data)
+            self.sequence += 1
+        self.frames += 1
+
+    def close(self):
+        if not self.frames:
+            raise ValueError("An animated PNG needs at least one frame")
+        write_chunk(self.fileobj, b"IEND", b"")
+        end = self.fileobj.tell()
+        self.fileobj.seek(self.actl_offset)
+        write_chunk(self.fileobj, b"acTL", struct.pack(">II", self.frames, self.loop))
+        self.fileobj.seek(end)
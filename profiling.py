@@ -0,0 +1,104 @@
+import io
+import time
+from contextlib import contextmanager
+from lazyload import lazy_import
+
+# Only needed by capture(), which most runs never use
+cProfile = lazy_import("cProfile")
+pstats = lazy_import("pstats")
+tracemalloc = lazy_import("tracemalloc")
+
+# Registered hooks are called as hook(stage_name, seconds) after each pipeline stage
+hooks = []
+
+class _NullStage:
+    # Shared no-op context manager used whenever no hook is registered
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _TimedStage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        for hook in hooks:
+            hook(self.name, elapsed)
+        return False
+
+def stage(name):
+    # `with profiling.stage("decode"):` costs one list check when profiling is off
+    return _TimedStage(name) if hooks else _NULL_STAGE
+
+def add_hook(hook):
+    hooks.append(hook)
+
+def remove_hook(hook):
+    if hook in hooks:
+        hooks.remove(hook)
+
+class StageTimer:
+    # Hook that accumulates total time and call count per stage, in first-seen order
+    def __init__(self):
+        self.totals = {}
+
+    def __call__(self, name, seconds):
+        total, count = self.totals.get(name, (0.0, 0))
+        self.totals[name] = (total + seconds, count + 1)
+
+    def __enter__(self):
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_hook(self)
+        return False
+
+    def merge(self, totals):
+        for name, (seconds, count) in totals.items():
+            total, seen = self.totals.get(name, (0.0, 0))
+            self.totals[name] = (total + seconds, seen + count)
+
+    def report(self):
+        grand_total = sum(total for total, _ in self.totals.values()) or 1e-12
+        lines = [f"{'stage':<12} {'total (ms)':>11} {'calls':>6} {'mean (ms)':>10} {'share':>7}"]
+        for name, (total, count) in self.totals.items():
+            lines.append(f"{name:<12} {total * 1000:>11.2f} {count:>6} {total / count * 1000:>10.3f} "
+                         f"{total / grand_total:>6.1%}")
+        return "\n".join(lines)
+
+@contextmanager
+def capture(use_cprofile=True, use_tracemalloc=False, top=15):
+    # Wraps one conversion; yields a dict that receives the text reports on exit
+    reports = {}
+    profiler = cProfile.Profile() if use_cprofile else None
+    if use_tracemalloc:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield reports
+    finally:
+        if profiler:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            reports["cprofile"] = out.getvalue()
+        if use_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MB"]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+            reports["tracemalloc"] = "\n".join(lines)
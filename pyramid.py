@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import OrderedDict
+import img_art
+import profiling
+from lazyload import lazy_import
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+# The decoded plane is capped at this width; ASCII output rarely goes past a few hundred
+# columns, and every level keeps at least twice the target so resizes still antialias
+DEFAULT_MAX_WIDTH = 4096
+MIN_LEVEL_WIDTH = 32
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class LoadedImage:
+    # One decode, then a grayscale mipmap pyramid (each level half the previous one).
+    # Re-targeting to a new width resizes from the smallest level that is still at least
+    # twice as wide, so it costs about as much as the output, not the source.
+    def __init__(self, image_path, max_width=DEFAULT_MAX_WIDTH):
+        with profiling.stage("decode"):
+            img = Image.open(image_path)
+            self.size = img.size
+            width, height = img.size
+            keep = (min(width, max_width), max(1, round(height * min(width, max_width) / width)))
+            # JPEG: scale in the DCT and decode luminance only
+            img.draft("L", keep)
+            img = img.convert("L")
+        with profiling.stage("pyramid"):
+            factor = img.size[0] // keep[0]
+            if factor >= 2:
+                img = img.reduce(factor)
+            self.levels = [img]
+            while self.levels[-1].size[0] // 2 >= MIN_LEVEL_WIDTH and self.levels[-1].size[1] >= 2:
+                self.levels.append(self.levels[-1].reduce(2))
+        self.nbytes = sum(level.size[0] * level.size[1] for level in self.levels)
+
+    def output_size(self, new_width):
+        # Same row count as img_art.image_to_ascii
+        width, height = self.size
+        return new_width, int(height / width * new_width)
+
+    def level_for(self, new_width):
+        # Smallest level at least twice the target width, or the full plane
+        for level in reversed(self.levels):
+            if level.size[0] >= new_width * 2:
+                return level
+        return self.levels[0]
+
+    def to_pixels(self, new_width):
+        with profiling.stage("resize"):
+            return np.array(self.level_for(new_width).resize(self.output_size(new_width)))
+
+    def to_ascii(self, new_width=100, ramp=None, dither=None):
+        return img_art.pixels_to_ascii(self.to_pixels(new_width), ramp, dither)
+
+    def to_frame(self, new_width=100, ramp=None, dither=None):
+        return img_art.pixels_to_frame(self.to_pixels(new_width), ramp, dither)
+
+    def to_ascii_widths(self, widths, ramp=None, dither=None):
+        # Several exports from one decode: {width: ascii_art}
+        return {width: self.to_ascii(width, ramp, dither) for width in widths}
+
+class PyramidCache:
+    # Open images in LRU order, evicted once their pyramids together exceed max_bytes;
+    # the most recent image is always kept, even if it alone is over the cap
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_width=DEFAULT_MAX_WIDTH):
+        self.max_bytes = max_bytes
+        self.max_width = max_width
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, image_path):
+        # A modified file gets a new key, so stale pyramids are never served
+        info = os.stat(image_path)
+        return os.path.abspath(image_path), info.st_mtime_ns, info.st_size
+
+    def get(self, image_path):
+        key = self._key(image_path)
+        with self._lock:
+            if key in self._images:
+                self.hits += 1
+                self._images.move_to_end(key)
+                return self._images[key]
+            self.misses += 1
+        # Decode outside the lock so other images stay available meanwhile
+        image = LoadedImage(image_path, self.max_width)
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > 1 and self.total_bytes() > self.max_bytes:
+                self._images.popitem(last=False)
+                self.evictions += 1
+        return image
+
+    def total_bytes(self):
+        return sum(image.nbytes for image in self._images.values())
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "images": len(self._images), "bytes": self.total_bytes(), "max_bytes": self.max_bytes}
+
+pyramid_cache = PyramidCache()
+
+def get_image(image_path):
+    return pyramid_cache.get(image_path)
+
+def image_to_ascii_widths(image_path, widths, ramp=None, dither=None):
+    return get_image(image_path).to_ascii_widths(widths, ramp, dither)
@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from collections import deque
+from tkinter import TclError
+
+class RenderWorker:
+    # Runs render_func off the Tk main thread. Requests arriving within debounce_ms of
+    # each other collapse into the newest one, and results that were superseded while
+    # rendering are dropped. Tk is not thread-safe, so results are handed over through a
+    # queue that the main thread drains from a window.after polling loop, which runs only
+    # while a request is outstanding. window should be the widget holding the ones
+    # on_result updates: once it is destroyed, results are dropped and the worker stops.
+    def __init__(self, window, render_func, on_result, on_error=None,
+                 debounce_ms=150, poll_ms=15, history=200):
+        self.window = window
+        self.render_func = render_func
+        self.on_result = on_result
+        self.on_error = on_error
+        self.debounce = debounce_ms / 1000
+        self.poll_ms = poll_ms
+        self.latencies = deque(maxlen=history)
+
+        self._condition = threading.Condition()
+        self._request = None  # (generation, submitted_at, args)
+        self._generation = 0
+        self._results = queue.Queue()
+        self._answered = 0  # newest generation a result has arrived for
+        self._polling = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, *args):
+        # Called from the Tk thread
+        with self._condition:
+            self._generation += 1
+            self._request = (self._generation, time.perf_counter(), args)
+            self._condition.notify()
+        if not self._polling:
+            self._polling = True
+            self.window.after(self.poll_ms, self._poll)
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and self._request is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                # Keep waiting until no newer request arrives for a full debounce window
+                while self._running:
+                    remaining = self._request[1] + self.debounce - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._running:
+                    return
+                generation, submitted_at, args = self._request
+                self._request = None
+            try:
+                result, error = self.render_func(*args), None
+            except Exception as e:
+                result, error = None, e
+            if generation == self._generation:
+                self._results.put((generation, submitted_at, result, error))
+
+    def _poll(self):
+        self._polling = False
+        if not self._running:
+            return
+        try:
+            alive = self.window.winfo_exists()
+        except TclError:
+            alive = False
+        if not alive:
+            self.stop()
+            return
+        newest = None
+        while True:
+            try:
+                newest = self._results.get_nowait()
+            except queue.Empty:
+                break
+        if newest is not None:
+            self._answered = max(self._answered, newest[0])
+        if newest is not None and newest[0] == self._generation:
+            _, submitted_at, result, error = newest
+            if error is None:
+                self.on_result(result)
+                self.latencies.append(time.perf_counter() - submitted_at)
+            elif self.on_error:
+                self.on_error(error)
+        # Superseded requests never produce a result, so keep polling until the newest does
+        if self._answered < self._generation:
+            self._polling = True
+            self.window.after(self.poll_ms, self._poll)
+
+    def percentiles(self):
+        # (p50, p95) keystroke-to-paint latency in milliseconds, or None before any render
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+        return pick(0.50), pick(0.95)
+
+    def latency_text(self):
+        stats = self.percentiles()
+        if stats is None:
+            return "Render latency: -"
+        return f"Render latency: p50 {stats[0]:.0f} ms, p95 {stats[1]:.0f} ms"
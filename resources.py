@@ -0,0 +1,171 @@
+import importlib.util
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from lazyload import lazy_import
+
+ImageFont = lazy_import("PIL.ImageFont")
+
+# Checked in order after the macOS defaults the app has always used
+MONOSPACE_FONT_CANDIDATES = [
+    "/System/Library/Fonts/Courier.ttf",
+    "/Library/Fonts/Courier New.ttf",
+    "/System/Library/Fonts/Supplemental/Courier New.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSansMono.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationMono-Regular.ttf",
+    "/usr/share/fonts/liberation-mono/LiberationMono-Regular.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeMono.ttf",
+    "C:\\Windows\\Fonts\\cour.ttf",
+]
+
+class LRUCache:
+    # Small thread-safe LRU with hit/miss counters
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, factory):
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+        # Build outside the lock so a slow load does not block other lookups
+        value = factory()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._items), "maxsize": self.maxsize}
+
+# Figlet font names, cached across processes next to the conversion cache
+FIGLET_INDEX_PATH = os.path.join(
+    os.environ.get("ASCII_ART_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ascii-art")),
+    "figlet_fonts.json")
+
+font_cache = LRUCache(maxsize=32)
+figlet_cache = LRUCache(maxsize=64)
+
+_monospace_font_path = None
+_font_discovery_done = False
+_discovery_lock = threading.Lock()
+_figlet_fonts = None
+
+def _fontconfig_match(pattern="monospace"):
+    import shutil
+    import subprocess
+    if not shutil.which("fc-match"):
+        return None
+    try:
+        result = subprocess.run(["fc-match", "-f", "%{file}", pattern],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    path = result.stdout.strip()
+    if result.returncode == 0 and path.lower().endswith((".ttf", ".otf", ".ttc")) and os.path.isfile(path):
+        return path
+    return None
+
+def find_monospace_font():
+    # Runs discovery once per process; None means fall back to Pillow's default font
+    global _monospace_font_path, _font_discovery_done
+    if _font_discovery_done:
+        return _monospace_font_path
+    with _discovery_lock:
+        if not _font_discovery_done:
+            path = next((p for p in MONOSPACE_FONT_CANDIDATES[:3] if os.path.isfile(p)), None)
+            path = path or _fontconfig_match()
+            path = path or next((p for p in MONOSPACE_FONT_CANDIDATES[3:] if os.path.isfile(p)), None)
+            _monospace_font_path = path
+            _font_discovery_done = True
+    return _monospace_font_path
+
+def _load_font(path, size):
+    if path is None:
+        return ImageFont.load_default()
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+def get_font(size, path=None):
+    # Loaded FreeTypeFont objects keyed by (path, size)
+    path = path or find_monospace_font()
+    return font_cache.get_or_create((path, size), lambda: _load_font(path, size))
+
+def get_figlet(font_name="standard"):
+    # Parsed Figlet fonts keyed by font name; rendering keeps no state on the instance
+    import pyfiglet
+    return figlet_cache.get_or_create(font_name, lambda: pyfiglet.Figlet(font=font_name))
+
+def _figlet_font_dirs():
+    # The directories pyfiglet.FigletFont.getFonts lists, found without importing pyfiglet
+    spec = importlib.util.find_spec("pyfiglet")
+    dirs = [os.path.join(spec.submodule_search_locations[0], "fonts")]
+    if sys.platform == "win32":
+        dirs.append(os.path.join(os.environ.get("APPDATA", ""), "pyfiglet"))
+    else:
+        dirs.append("/usr/local/share/pyfiglet/")
+    return dirs
+
+def _dir_stamps(dirs):
+    stamps = []
+    for path in dirs:
+        try:
+            stamps.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            stamps.append([path, None])
+    return stamps
+
+def list_figlet_fonts(index_path=FIGLET_INDEX_PATH):
+    # Sorted Figlet font names. getFonts imports pyfiglet and opens every font file, so
+    # its result is kept in memory and in an index file; both are rebuilt when a font
+    # directory's mtime changes (a font was added or removed).
+    global _figlet_fonts
+    stamps = _dir_stamps(_figlet_font_dirs())
+    if _figlet_fonts is not None and _figlet_fonts[0] == stamps:
+        return list(_figlet_fonts[1])
+    fonts = None
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index["dirs"] == stamps:
+            fonts = index["fonts"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    if fonts is None:
+        import pyfiglet
+        fonts = sorted(pyfiglet.FigletFont.getFonts())
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"dirs": stamps, "fonts": fonts}, f)
+            os.replace(temp_path, index_path)
+        except OSError:
+            pass
+    _figlet_fonts = (stamps, fonts)
+    return list(fonts)
+
+def cache_stats():
+    return {"fonts": font_cache.stats(), "figlet": figlet_cache.stats(),
+            "monospace_font": find_monospace_font()}
@@ -0,0 +1,317 @@
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_MAX_UPLOAD = 20 * 1024 * 1024
+# Open connections beyond this get 503 before anything is read; a client has this many
+# seconds to send its request head and again for its body
+DEFAULT_MAX_CONNECTIONS = 256
+DEFAULT_READ_TIMEOUT = 30
+# Latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               408: "Request Timeout", 413: "Payload Too Large", 429: "Too Many Requests",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Worker-side functions: run in the process pool, so they only take and return plain data
+
+def convert_image(data, width, ramp, output_format, is_dark_mode):
+    import img_art
+    stages = {}
+    start = time.perf_counter()
+    if output_format == "ansi":
+        import color_art
+        ascii_art, rgb = color_art.image_to_color_ascii(io.BytesIO(data), width, ramp)
+        stages["decode"] = time.perf_counter() - start
+        start = time.perf_counter()
+        body = color_art.to_ansi_truecolor(ascii_art, rgb).encode("utf-8")
+        stages["ansi"] = time.perf_counter() - start
+        return body, "text/plain; charset=utf-8", stages
+
+    pixels = img_art.load_grayscale(io.BytesIO(data), width)
+    stages["decode"] = time.perf_counter() - start
+    start = time.perf_counter()
+    ascii_art = img_art.pixels_to_ascii(pixels, ramp)
+    stages["map"] = time.perf_counter() - start
+    if output_format == "png":
+        return _encode_png(ascii_art, is_dark_mode, stages)
+    return ascii_art.encode("utf-8"), "text/plain; charset=utf-8", stages
+
+def render_text_batch(requests):
+    # One pool task renders a whole batch of small /text requests
+    import resources
+    results = []
+    for text, font, output_format, is_dark_mode in requests:
+        try:
+            stages = {}
+            start = time.perf_counter()
+            ascii_art = resources.get_figlet(font).renderText(text)
+            stages["figlet"] = time.perf_counter() - start
+            if output_format == "png":
+                results.append((200, _encode_png(ascii_art, is_dark_mode, stages)))
+            else:
+                results.append((200, (ascii_art.encode("utf-8"), "text/plain; charset=utf-8", stages)))
+        except Exception as e:
+            results.append((400, (f"{type(e).__name__}: {e}\n".encode("utf-8"), "text/plain", {})))
+    return results
+
+def _encode_png(ascii_art, is_dark_mode, stages):
+    import img_art
+    start = time.perf_counter()
+    img = img_art.render_ascii_image(ascii_art, is_dark_mode)
+    stages["render"] = time.perf_counter() - start
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    stages["encode"] = time.perf_counter() - start
+    return buffer.getvalue(), "image/png", stages
+
+class Metrics:
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.stages = {}
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.started = time.time()
+
+    def observe(self, endpoint, status, seconds):
+        # Unknown paths share one series so clients cannot grow the metrics without bound
+        if endpoint not in ("/image", "/text", "/metrics"):
+            endpoint = "other"
+        key = f"{endpoint} {status}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+        buckets = self.latency.setdefault(endpoint, [0] * len(LATENCY_BUCKETS))
+        milliseconds = seconds * 1000
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if milliseconds <= bound:
+                buckets[i] += 1
+                break
+
+    def observe_stages(self, stages):
+        for name, seconds in stages.items():
+            total, count = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (total + seconds, count + 1)
+
+    def snapshot(self):
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "latency_ms_buckets": [str(b) for b in LATENCY_BUCKETS],
+            "latency_histograms": self.latency,
+            "stages_ms": {name: {"mean": round(total / count * 1000, 3), "count": count}
+                          for name, (total, count) in self.stages.items()},
+        }
+
+class HttpError(Exception):
+    def __init__(self, status, message=""):
+        super().__init__(message)
+        self.status = status
+
+class ConversionServer:
+    def __init__(self, workers=None, max_pending=None, max_upload=DEFAULT_MAX_UPLOAD,
+                 batch_window_ms=5, batch_size=16, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 read_timeout=DEFAULT_READ_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.max_upload = max_upload
+        self.max_connections = max_connections
+        self.read_timeout = read_timeout
+        self.batch_window = batch_window_ms / 1000
+        self.batch_size = batch_size
+        # Spawned (not forked) workers so they never inherit open client sockets, which
+        # would keep connections from closing
+        self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        self.metrics = Metrics()
+        self._text_batch = []
+        self._batch_task = None
+
+    async def run_in_pool(self, func, *args):
+        # Backpressure: refuse new work instead of growing an unbounded queue
+        if self.metrics.queue_depth >= self.max_pending:
+            raise HttpError(429, "Server busy, retry later")
+        self.metrics.queue_depth += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        finally:
+            self.metrics.queue_depth -= 1
+
+    async def submit_text(self, request):
+        # Collect /text requests for a few milliseconds and render them as one pool task;
+        # a whole batch occupies a single pool slot
+        if self.metrics.queue_depth >= self.max_pending:
+            raise HttpError(429, "Server busy, retry later")
+        future = asyncio.get_running_loop().create_future()
+        self._text_batch.append((request, future))
+        if len(self._text_batch) >= self.batch_size:
+            self._flush_text_batch()
+        elif self._batch_task is None:
+            self._batch_task = asyncio.get_running_loop().call_later(self.batch_window, self._flush_text_batch)
+        return await future
+
+    def _flush_text_batch(self):
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            self._batch_task = None
+        batch, self._text_batch = self._text_batch, []
+        if batch:
+            asyncio.ensure_future(self._run_text_batch(batch))
+
+    async def _run_text_batch(self, batch):
+        try:
+            results = await self.run_in_pool(render_text_batch, [request for request, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        endpoint = "?"
+        self.metrics.in_flight += 1
+        try:
+            try:
+                if self.metrics.in_flight > self.max_connections:
+                    raise HttpError(503, "Too many connections, retry later")
+                # Slow or idle clients would otherwise hold their connection open forever
+                try:
+                    method, target, headers = await asyncio.wait_for(self._read_head(reader), self.read_timeout)
+                    url = urlsplit(target)
+                    endpoint = url.path
+                    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                    body = await asyncio.wait_for(self._read_body(reader, headers), self.read_timeout)
+                except asyncio.TimeoutError:
+                    raise HttpError(408, "Timed out reading the request")
+                status, payload, content_type = await self.route(method, endpoint, params, body)
+            except HttpError as e:
+                status, payload, content_type = e.status, f"{e}\n".encode("utf-8"), "text/plain"
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except Exception as e:
+                status, payload, content_type = 500, f"{type(e).__name__}: {e}\n".encode("utf-8"), "text/plain"
+            await self._write_response(writer, status, payload, content_type)
+            self.metrics.observe(endpoint, status, time.perf_counter() - start)
+        finally:
+            self.metrics.in_flight -= 1
+            writer.close()
+
+    async def _read_head(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return parts[0].upper(), parts[1], headers
+
+    async def _read_body(self, reader, headers):
+        length = headers.get("content-length") or "0"
+        if not length.isdigit():
+            raise HttpError(400, "Content-Length must be a non-negative integer")
+        length = int(length)
+        if length > self.max_upload:
+            raise HttpError(413, f"Upload exceeds {self.max_upload} bytes")
+        return await reader.readexactly(length) if length else b""
+
+    async def _write_response(self, writer, status, payload, content_type):
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                + ("Retry-After: 1\r\n" if status in (429, 503) else "")
+                + "Connection: close\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def route(self, method, path, params, body):
+        if path == "/metrics":
+            return 200, json.dumps(self.metrics.snapshot(), indent=2).encode("utf-8"), "application/json"
+        output_format = params.get("format", "text")
+        is_dark_mode = params.get("dark", "0") not in ("0", "false", "")
+        if path == "/image":
+            if method != "POST":
+                raise HttpError(405, "POST the image bytes to /image")
+            if not body:
+                raise HttpError(400, "Empty image body")
+            if output_format not in ("text", "ansi", "png"):
+                raise HttpError(400, "format must be text, ansi or png")
+            width = params.get("width", "100")
+            if not width.isdigit() or not 1 <= int(width) <= 2000:
+                raise HttpError(400, "width must be between 1 and 2000")
+            try:
+                payload, content_type, stages = await self.run_in_pool(
+                    convert_image, body, int(width), params.get("ramp"), output_format, is_dark_mode)
+            except HttpError:
+                raise
+            except Exception as e:
+                raise HttpError(400, f"Could not convert image: {e}")
+            self.metrics.observe_stages(stages)
+            return 200, payload, content_type
+        if path == "/text":
+            text = params.get("text") or body.decode("utf-8", "replace")
+            if not text.strip():
+                raise HttpError(400, "No text given")
+            # Figlet output has no colors to carry, so there is no ansi variant
+            if output_format not in ("text", "png"):
+                raise HttpError(400, "format must be text or png")
+            status, (payload, content_type, stages) = await self.submit_text(
+                (text, params.get("font", "standard"), output_format, is_dark_mode))
+            self.metrics.observe_stages(stages)
+            return status, payload, content_type
+        raise HttpError(404, "Unknown endpoint")
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on http://{host}:{port} with {self.workers} workers")
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP service for image and text ASCII art")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Queued conversions before answering 429 (default: 4x workers)")
+    parser.add_argument("--max-upload-mb", type=float, default=DEFAULT_MAX_UPLOAD / (1024 * 1024))
+    parser.add_argument("--batch-window-ms", type=float, default=5)
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help="Open connections before answering 503")
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT,
+                        help="Seconds allowed for reading the request head and again for the body")
+    args = parser.parse_args(argv)
+
+    server = ConversionServer(args.workers, args.max_pending, int(args.max_upload_mb * 1024 * 1024),
+                              args.batch_window_ms, max_connections=args.max_connections,
+                              read_timeout=args.read_timeout)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.pool.shutdown(cancel_futures=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
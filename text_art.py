@@ -1,7 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pyfiglet
-from PIL import Image, ImageDraw, ImageFont
+import glyph_atlas
+import resources
+from font_gallery import FontGallery
+from gallery_window import FontGalleryWindow
+from incremental_figlet import IncrementalFigletCache, update_text_widget
+from render_worker import RenderWorker
 
 class TextArtGenerator:
     def __init__(self):
@@ -14,7 +18,8 @@ class TextArtGenerator:
         self.window.grid_columnconfigure(0, weight=1)
         
         self.current_ascii_art = ""
-        self.available_fonts = pyfiglet.FigletFont.getFonts()
+        self.available_fonts = resources.list_figlet_fonts()
+        self.font_gallery = FontGallery()
         self.setup_ui()
         
     def setup_ui(self):
@@ -78,50 +83,58 @@ class TextArtGenerator:
                   command=lambda: self.save_ascii('png')).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Save as TXT",
                   command=lambda: self.save_ascii('txt')).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Font Gallery",
+                  command=self.show_gallery).pack(side=tk.LEFT, padx=5)
+        
+        # Status bar with render latency
+        self.status_label = ttk.Label(main_frame, text="Render latency: -")
+        self.status_label.grid(row=3, column=0, sticky="w", padx=5)
+        
+        # Figlet rendering runs off the main thread so typing never blocks the UI
+        # Only the suffix after the previous text is re-rendered, per font
+        self.figlet_renderers = IncrementalFigletCache()
+        self.render_worker = RenderWorker(
+            self.window,
+            self.figlet_renderers.render,
+            self.show_preview,
+            lambda e: messagebox.showerror("Error", f"Failed to generate ASCII art: {str(e)}")
+        )
     
     def generate_preview(self):
         text = self.text_input.get().strip()
         if text:
-            try:
-                f = pyfiglet.Figlet(font=self.font_style.get())
-                self.current_ascii_art = f.renderText(text)
-                self.ascii_preview.delete(1.0, tk.END)
-                self.ascii_preview.insert(1.0, self.current_ascii_art)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to generate ASCII art: {str(e)}")
+            self.render_worker.submit(text, self.font_style.get())
+    
+    def show_gallery(self):
+        text = self.text_input.get().strip()
+        if not text:
+            messagebox.showwarning("Warning", "Enter some text first!")
+            return
+        FontGalleryWindow(self.window, self.font_gallery, text, self.select_font)
+    
+    def select_font(self, font):
+        self.font_style.set(font)
+        self.generate_preview()
+    
+    def show_preview(self, ascii_art):
+        # Rewrite only the changed columns of the changed lines
+        update_text_widget(self.ascii_preview, self.ascii_preview.get(1.0, 'end-1c'), ascii_art)
+        self.current_ascii_art = ascii_art
+        self.status_label.config(text=self.render_worker.latency_text())
     
     def save_ascii_to_png(self, ascii_art, output_path):
-        # Calculate dimensions
-        lines = ascii_art.split("\n")
-        line_count = len(lines)
-        max_line_length = max(len(line) for line in lines)
-        
         # Font configuration
         font_size = 15
         char_width = font_size * 0.6
         char_height = font_size * 1.2
         padding = 40
         
-        # Calculate image dimensions
-        width = int(max_line_length * char_width) + padding * 2
-        height = int(line_count * char_height) + padding * 2
-        
-        # Create image
-        img = Image.new("RGB", (width, height), "white")
-        draw = ImageDraw.Draw(img)
-        
-        # Try to load font
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Courier.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        # Monospace font, discovered once and cached per size
+        font = resources.get_font(font_size)
         
-        # Draw ASCII art
-        y = padding
-        for line in lines:
-            if line.strip():
-                draw.text((padding, y), line, font=font, fill="black")
-            y += char_height
+        # Composite ASCII art from pre-rasterized glyphs
+        img = glyph_atlas.render_ascii(ascii_art, font, char_width, char_height, padding,
+                                       "white", "black")
         
         # Save image
         img.save(output_path, quality=95, dpi=(300, 300))
@@ -158,6 +171,7 @@ class TextArtGenerator:
     
     def run(self):
         self.window.mainloop()
+        self.font_gallery.shutdown()
 
 if __name__ == "__main__":
     app = TextArtGenerator()
@@ -0,0 +1,240 @@
+import argparse
+import math
+import sys
+from contextlib import contextmanager
+import numpy as np
+from PIL import Image
+import glyph_atlas
+import img_art
+import png_stream
+import profiling
+import resources
+
+DEFAULT_STRIP_MB = 64
+RAW_BANDS = {"L": 1, "RGB": 3, "BGR": 3}
+
+def _to_gray(strip, rawmode):
+    if rawmode == "L":
+        return np.asarray(strip[:, :, 0])
+    if rawmode == "BGR":
+        strip = strip[:, :, ::-1]
+    # Pillow's own conversion, so the luma matches Image.convert("L") exactly
+    return np.asarray(Image.fromarray(np.ascontiguousarray(strip), "RGB").convert("L"))
+
+@contextmanager
+def _no_pixel_limit():
+    # Huge images are the point of this module, so Pillow's decompression-bomb limit is
+    # lifted for every open, decode and crop here
+    limit, Image.MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS, None
+    try:
+        yield
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+
+class RawSource:
+    # Uncompressed rows read straight from the file with one seek per strip, so only the
+    # strip being converted is ever in memory (a memory map would keep every page it
+    # touched resident until the kernel evicts it)
+    def __init__(self, path, segments, width, height):
+        self.path = path
+        self.segments = segments  # (first row, end row, file offset, stride, rawmode, orientation)
+        self.width = width
+        self.height = height
+
+    def read(self, y0, y1):
+        parts = []
+        with open(self.path, "rb") as f:
+            for start, end, offset, stride, rawmode, orientation in self.segments:
+                lo, hi = max(y0, start), min(y1, end)
+                if lo >= hi:
+                    continue
+                # Bottom-up files (BMP) store the last row first
+                first = lo - start if orientation == 1 else end - hi
+                f.seek(offset + first * stride)
+                data = np.fromfile(f, dtype=np.uint8, count=(hi - lo) * stride).reshape(hi - lo, stride)
+                rows = data[:, :self.width * RAW_BANDS[rawmode]].reshape(hi - lo, self.width, RAW_BANDS[rawmode])
+                parts.append(_to_gray(rows[::-1] if orientation == -1 else rows, rawmode))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+class ImageSource:
+    # Fallback for compressed formats Pillow can only decode whole. JPEGs are decoded at
+    # reduced resolution so memory follows the output size, but PNG and compressed TIFF
+    # are decoded in full (a 15000x12500 PNG peaks around 500 MB), so the bounded-memory
+    # promise only holds for RawSource. img is an already opened image.
+    def __init__(self, img, new_width):
+        with profiling.stage("decode"):
+            rows = max(1, int(img.size[1] / img.size[0] * new_width))
+            img.draft("L", (new_width * 2, rows * 2))
+            self.image = img.convert("L")
+        self.width, self.height = self.image.size
+
+    def read(self, y0, y1):
+        # crop checks the strip size against the limit again
+        with _no_pixel_limit():
+            return np.asarray(self.image.crop((0, y0, self.width, y1)))
+
+def raw_source(path, width, height, rawmode="L", offset=0):
+    # Headerless raster dump (e.g. from a scanner)
+    if rawmode not in RAW_BANDS:
+        raise ValueError(f"Raw mode must be one of {', '.join(RAW_BANDS)}")
+    stride = width * RAW_BANDS[rawmode]
+    return RawSource(path, [(0, height, offset, stride, rawmode, 1)], width, height)
+
+def _raw_segments(img):
+    # Full-width uncompressed tiles (PGM/PPM, uncompressed TIFF strips, BMP) can be read
+    # row by row from the file; anything else returns None
+    segments = []
+    for codec, (x0, y0, x1, y1), offset, args in img.tile:
+        rawmode, stride, orientation = (args, 0, 1) if isinstance(args, str) else (tuple(args) + (0, 1))[:3]
+        if codec != "raw" or x0 != 0 or x1 != img.size[0] or rawmode not in RAW_BANDS:
+            return None
+        row_bytes = img.size[0] * RAW_BANDS[rawmode]
+        stride = stride or row_bytes
+        if stride < row_bytes or orientation not in (1, -1):
+            return None
+        segments.append((y0, y1, offset, stride, rawmode, orientation))
+    return segments or None
+
+def open_source(image_path, new_width):
+    # The fallback decodes from the same open image, so the limit stays lifted until the
+    # decode is done
+    with _no_pixel_limit(), Image.open(image_path) as img:
+        segments = _raw_segments(img) if isinstance(image_path, str) else None
+        if segments:
+            return RawSource(image_path, segments, *img.size)
+        return ImageSource(img, new_width)
+
+def ascii_bands(source, new_width=100, ramp=None, strip_mb=DEFAULT_STRIP_MB):
+    # Yields the ASCII art a few rows at a time. Each band of output rows reads only the
+    # source rows it covers (about strip_mb of grayscale) and area-averages them down.
+    rows = max(1, int(source.height / source.width * new_width))
+    scale = source.height / rows
+    band_rows = max(1, int(strip_mb * 1024 * 1024 // max(1, source.width * scale)))
+    for r0 in range(0, rows, band_rows):
+        r1 = min(rows, r0 + band_rows)
+        top, bottom = r0 * scale, r1 * scale
+        y0, y1 = int(top), min(source.height, math.ceil(bottom))
+        with profiling.stage("decode"):
+            strip = Image.fromarray(source.read(y0, y1))
+        with profiling.stage("resize"):
+            band = strip.resize((new_width, r1 - r0), Image.Resampling.BOX,
+                                box=(0, top - y0, source.width, bottom - y0))
+        yield img_art.pixels_to_ascii(np.asarray(band), ramp)
+
+class StreamingPNGRenderer:
+    # Same font and layout as img_art.save_ascii_to_png, but canvas rows are rendered and
+    # encoded band_height rows at a time as the lines arrive
+    def __init__(self, fileobj, columns, line_count, is_dark_mode=True, band_height=256):
+        font_size = 15
+        self.char_width = font_size * 0.6
+        self.char_height = font_size * 0.9
+        self.padding = 40
+        self.font = resources.get_font(font_size)
+        self.cell_height = glyph_atlas.get_atlas(self.font).cell_height
+        if is_dark_mode:
+            self.table = glyph_atlas.get_color_table((0, 0, 0), (0, 255, 0))
+        else:
+            self.table = glyph_atlas.get_color_table((255, 255, 255), (102, 102, 102))
+        self.line_count = line_count
+        self.band_height = band_height
+        self.width = int(columns * self.char_width) + self.padding * 2
+        self.height = int(line_count * self.char_height) + self.padding * 2
+        self.writer = png_stream.PNGStreamWriter(fileobj, self.width, self.height, "RGB", dpi=(300, 300))
+        self.lines = []
+        self.first_line = 0
+        self.next_y = 0
+
+    def _top(self, line):
+        return glyph_atlas.line_top(line, self.char_height, self.padding)
+
+    def add_lines(self, lines):
+        self.lines.extend(lines)
+        known = self.first_line + len(self.lines)
+        # Canvas rows above the next line's top are final: later lines only draw below it
+        self._render_until(self._top(known) if known < self.line_count else self.height)
+
+    def _render_until(self, y_end):
+        y_end = min(y_end, self.height)
+        while self.next_y < y_end:
+            y1 = min(y_end, self.next_y + self.band_height)
+            count = 0
+            while count < len(self.lines) and self._top(self.first_line + count) < y1:
+                count += 1
+            with profiling.stage("rasterize"):
+                coverage = glyph_atlas.render_coverage_band(
+                    self.lines[:count], self.first_line, self.font, self.char_width, self.char_height,
+                    self.padding, self.width, self.next_y, y1)
+                pixels = self.table[coverage]
+            with profiling.stage("encode"):
+                self.writer.write_rows(pixels)
+            self.next_y = y1
+            # Lines whose cells end above the next band are done
+            while self.lines and self._top(self.first_line) + self.cell_height <= self.next_y:
+                self.lines.pop(0)
+                self.first_line += 1
+
+    def close(self):
+        self._render_until(self.height)
+        self.writer.close()
+
+def convert_tiled(image_path, new_width=100, ramp=None, text_path=None, png_path=None, is_dark_mode=True,
+                  strip_mb=DEFAULT_STRIP_MB, raw=None):
+    # raw is (width, height, rawmode, offset) for headerless input
+    source = raw_source(image_path, *raw) if raw else open_source(image_path, new_width)
+    rows = max(1, int(source.height / source.width * new_width))
+    text_file = open(text_path, "w", encoding="utf-8") if text_path else None
+    png_file = open(png_path, "wb") if png_path else None
+    try:
+        # The trailing newline adds one empty line, as in img_art.save_ascii_to_png
+        renderer = StreamingPNGRenderer(png_file, new_width, rows + 1, is_dark_mode) if png_file else None
+        for text in ascii_bands(source, new_width, ramp, strip_mb):
+            if text_file:
+                text_file.write(text)
+            if renderer:
+                renderer.add_lines(text.split("\n")[:-1])
+        if renderer:
+            renderer.close()
+    finally:
+        for f in (text_file, png_file):
+            if f:
+                f.close()
+    return rows
+
+def _parse_raw(value):
+    # WIDTHxHEIGHT[:MODE[:OFFSET]]
+    size, _, rest = value.partition(":")
+    rawmode, _, offset = rest.partition(":")
+    width, height = (int(n) for n in size.lower().split("x"))
+    return width, height, rawmode or "L", int(offset or 0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert very large images to ASCII art in bounded memory, strip by strip")
+    parser.add_argument("image")
+    parser.add_argument("-o", "--output", help="Stream the ASCII text to this file")
+    parser.add_argument("--png", help="Stream a rendered PNG to this file")
+    parser.add_argument("-w", "--width", type=int, default=100)
+    parser.add_argument("--ramp", default=None, help="Ramp name (standard, extended) or custom characters")
+    parser.add_argument("--dark", action="store_true", help="Render the PNG in dark mode")
+    parser.add_argument("--strip-mb", type=float, default=DEFAULT_STRIP_MB,
+                        help="Grayscale source rows held in memory at once (default %(default)s MB)")
+    parser.add_argument("--raw", type=_parse_raw, default=None, metavar="WxH[:MODE[:OFFSET]]",
+                        help="Treat the input as headerless pixels (MODE is L, RGB or BGR)")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage time breakdown")
+    args = parser.parse_args(argv)
+    if not args.output and not args.png:
+        parser.error("give --output, --png or both")
+
+    timer = profiling.StageTimer()
+    if args.profile:
+        profiling.add_hook(timer)
+    rows = convert_tiled(args.image, args.width, args.ramp, args.output, args.png, args.dark,
+                         args.strip_mb, args.raw)
+    profiling.remove_hook(timer)
+    print(f"Wrote {rows} rows of {args.width} characters")
+    if args.profile:
+        print(timer.report())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import argparse
+import queue
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+import animated_art
+import glyph_atlas
+import img_art
+import profiling
+
+_END = object()
+
+class FrameReader:
+    # Decodes frames on a background thread into a bounded queue. Frames that would
+    # exceed the target FPS are skipped with grab(), which avoids decoding them fully.
+    def __init__(self, source, target_fps=None, queue_size=8):
+        self.capture = cv2.VideoCapture(source)
+        if not self.capture.isOpened():
+            raise ValueError(f"Could not open video: {source}")
+        self.source_fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.fps = min(target_fps, self.source_fps) if target_fps else self.source_fps
+        self.width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frames = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+
+    def _decode(self):
+        step = self.source_fps / self.fps
+        next_frame = 0.0
+        index = 0
+        try:
+            while not self._stop.is_set():
+                if index + 0.5 < next_frame:
+                    if not self.capture.grab():
+                        break
+                    index += 1
+                    continue
+                ok, frame = self.capture.read()
+                if not ok:
+                    break
+                index += 1
+                next_frame += step
+                self._put(frame)
+        finally:
+            self.capture.release()
+            self._put(_END)
+
+    def _put(self, item):
+        # Block while the queue is full, but give up once the consumer has gone away
+        while not self._stop.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def __iter__(self):
+        self._thread.start()
+        try:
+            while True:
+                frame = self.frames.get()
+                if frame is _END:
+                    break
+                yield frame
+        finally:
+            self.close()
+
+    def close(self):
+        self._stop.set()
+
+class FrameConverter:
+    # Grayscale, resize and glyph mapping with buffers allocated once and reused
+    def __init__(self, frame_width, frame_height, new_width=100, ramp=None):
+        self.new_width = new_width
+        self.new_height = max(1, int(frame_height / frame_width * new_width))
+        self.table = img_art.build_lookup_table(ramp)
+        self.gray = np.empty((frame_height, frame_width), dtype=np.uint8)
+        self.small = np.empty((self.new_height, new_width), dtype=np.uint8)
+        self.glyphs = np.empty((self.new_height, new_width + 1), dtype="<u4")
+        self.glyphs[:, new_width] = ord("\n")
+
+    def convert(self, frame):
+        with profiling.stage("grayscale"):
+            if frame.ndim == 3:
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+                gray = self.gray
+            else:
+                gray = frame
+        with profiling.stage("resize"):
+            cv2.resize(gray, (self.new_width, self.new_height), dst=self.small,
+                       interpolation=cv2.INTER_AREA)
+        with profiling.stage("map"):
+            np.take(self.table, self.small, out=self.glyphs[:, :self.new_width], mode="clip")
+            return self.glyphs.tobytes().decode("utf-32-le")
+
+def video_to_ascii_frames(source, new_width=100, ramp=None, target_fps=None, queue_size=8):
+    # Generator yielding (frame text, fps) for every kept frame
+    reader = FrameReader(source, target_fps, queue_size)
+    converter = FrameConverter(reader.width, reader.height, new_width, ramp)
+    for frame in reader:
+        yield converter.convert(frame), reader.fps
+
+def write_text_stream(frames, output_path):
+    # Frames are separated by a form feed so they can be split again with str.split("\f")
+    count = 0
+    with open(output_path, "w") as f:
+        for ascii_art, _ in frames:
+            if count:
+                f.write("\f")
+            f.write(ascii_art)
+            count += 1
+    return count
+
+def write_video(frames, output_path, is_dark_mode=True):
+    # MP4 via OpenCV, GIF via animated_art's streaming writer, chosen by file extension.
+    # Every frame is rendered into the same coverage canvas and color buffer.
+    if output_path.lower().endswith(".gif"):
+        return _write_gif(frames, output_path, is_dark_mode)
+    renderer = animated_art.FrameRenderer(is_dark_mode)
+    # Coverage indexes the blended text colors directly; OpenCV wants them as BGR
+    table = np.ascontiguousarray(renderer.palette[:, ::-1])
+    writer = None
+    pixels = None
+    count = 0
+    try:
+        for ascii_art, fps in frames:
+            coverage = renderer.render(glyph_atlas.split_lines(ascii_art))
+            if writer is None:
+                fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+                writer = cv2.VideoWriter(output_path, fourcc, fps, coverage.shape[::-1])
+                pixels = np.empty(coverage.shape + (3,), dtype=np.uint8)
+            with profiling.stage("encode"):
+                np.take(table, coverage, axis=0, out=pixels)
+                writer.write(pixels)
+            count += 1
+    finally:
+        if writer is not None:
+            writer.release()
+    return count
+
+def _write_gif(frames, output_path, is_dark_mode):
+    # Frames are written as they arrive. The palette is the exact table of blended text
+    # colors the coverage values index, so no frame is quantized or dithered.
+    return animated_art.write_gif(((glyph_atlas.split_lines(ascii_art), int(1000 / fps))
+                                   for ascii_art, fps in frames), output_path, is_dark_mode)
+
+def play_in_terminal(frames, stream=sys.stdout):
+    # Redraw from the top-left corner each frame and drop frames when running behind
+    count = 0
+    start = time.perf_counter()
+    stream.write("\x1b[2J")
+    try:
+        for ascii_art, fps in frames:
+            due = start + count / fps
+            count += 1
+            now = time.perf_counter()
+            if now > due + 1 / fps:
+                continue
+            if now < due:
+                time.sleep(due - now)
+            stream.write("\x1b[H" + ascii_art)
+            stream.flush()
+    except KeyboardInterrupt:
+        pass
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a video to ASCII art")
+    parser.add_argument("source", help="Video file path or camera index")
+    parser.add_argument("-o", "--output", help="Output .txt, .mp4 or .gif (omit to play in the terminal)")
+    parser.add_argument("-w", "--width", type=int, default=100)
+    parser.add_argument("--ramp", default=None, help="Ramp name (standard, extended) or custom characters")
+    parser.add_argument("--fps", type=float, default=None, help="Target frames per second")
+    parser.add_argument("--dark", action="store_true", help="Render video output in dark mode")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage time breakdown")
+    args = parser.parse_args(argv)
+
+    timer = profiling.StageTimer()
+    if args.profile:
+        profiling.add_hook(timer)
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    frames = video_to_ascii_frames(source, args.width, args.ramp, args.fps)
+    if not args.output:
+        play_in_terminal(frames)
+    elif args.output.lower().endswith(".txt"):
+        print(f"Wrote {write_text_stream(frames, args.output)} frames")
+    else:
+        print(f"Wrote {write_video(frames, args.output, args.dark)} frames")
+    if args.profile:
+        print(timer.report(), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())